@@ -1,37 +1,103 @@
 """Main Dash application with WebSocket support via async-dash + Quart."""
 
 import asyncio
+import csv
+import gzip
+import hashlib
 import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
 import time
-from pathlib import Path
-from quart import send_file as quart_send_file, websocket
+from quart import request, send_file as quart_send_file, websocket
+from quart.wrappers.response import DataBody
 from async_dash import Dash
 from flask_caching import Cache
 import diskcache
 from dash import DiskcacheManager
-import pandas as pd
+from dash.fingerprint import check_fingerprint
+from plotly.io.json import to_json_plotly
 
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-
-from src.data_loader import load_phenobase_data, extract_metadata_columns
+from werkzeug.http import unquote_etag
+
+try:
+    import uvloop  # optional: faster event loop for the WebSocket/HTTP server
+except ImportError:
+    uvloop = None
+
+try:
+    # optional: faster serialization of WebSocket payloads; Dash callback
+    # responses also pick it up through plotly's "auto" JSON engine
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli  # optional: smaller compressed responses than gzip
+except ImportError:
+    brotli = None
+
+from src.data_loader import load_phenobase_data, extract_metadata_columns, prewarm_feature_kernel
 from src.layout import create_layout
 from src.callbacks import register_callbacks
 
 # Force unbuffered output
 sys.stdout.reconfigure(line_buffering=True)
 
-# Configure logging for debug mode
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
-    datefmt='%H:%M:%S'
-)
-
-# Track connected WebSocket clients
-connected_clients = set()
+# Configure logging: callbacks only enqueue records, and a listener thread
+# does the formatting and writing, so log I/O never blocks a request.
+# Set DEPICTIO_LOG_LEVEL=DEBUG to see the per-callback trace
+LOG_LEVEL = os.environ.get("DEPICTIO_LOG_LEVEL", "WARNING").upper()
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(name)s: %(message)s', datefmt='%H:%M:%S'))
+log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+logging.basicConfig(level=LOG_LEVEL, handlers=[logging.handlers.QueueHandler(_log_queue)])
+log_listener.start()
+
+
+def _log_directly_in_child():
+    """Write log records straight to the handler in forked children, which have no listener thread."""
+    logging.getLogger().handlers = [_log_handler]
+
+
+# Background callbacks run in processes forked by the DiskcacheManager; their
+# queued records would otherwise never be written
+os.register_at_fork(after_in_child=_log_directly_in_child)
+
+# Track connected WebSocket clients: websocket -> (outbound queue, handler task)
+connected_clients = {}
+
+# Per-client outbound delivery
+MAX_CONNECTIONS = 2000  # further clients are turned away with 1013 (try again later)
+WS_PING_INTERVAL = 30.0  # seconds between protocol-level pings that flush out dead peers
+CLIENT_QUEUE_SIZE = 256  # pending messages before a client is considered stalled
+CLIENT_SEND_TIMEOUT = 5.0  # seconds before a slow send drops the client
+
+# Window for merging adjacent CSV changes into a single broadcast
+COALESCE_WINDOW = 0.25  # seconds
+
+# Response compression for the page, the layout, callback JSON and scripts
+COMPRESS_MIMETYPES = {"text/html", "application/json", "text/javascript", "application/javascript"}
+COMPRESS_MIN_SIZE = 500  # bytes; smaller bodies are not worth a Content-Encoding
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4  # fast enough to run per callback response
+# Appended to the ETag of a compressed body, so caches never mix encodings
+ETAG_ENCODING_SUFFIX = {"gzip": "gz", "br": "br"}
+
+# Image responses: read size per chunk and browser cache lifetime
+IMAGE_CHUNK_SIZE = 64 * 1024  # bytes (Quart's default is 8 KiB)
+IMAGE_CACHE_MAX_AGE = 3600  # seconds
+# When running behind nginx, set to its internal location (e.g. "/_internal_images/")
+# so image bytes are sent by nginx via X-Accel-Redirect instead of this process
+IMAGE_ACCEL_REDIRECT_PREFIX = os.environ.get("IMAGE_ACCEL_REDIRECT_PREFIX")
+# Resolved image root with a trailing separator, joined to whitelisted paths
+IMAGE_BASE = os.path.realpath("data") + os.sep
 
 cache_dir = diskcache.Cache("./.cache")
 background_callback_manager = DiskcacheManager(cache_dir)
@@ -48,15 +114,25 @@ app = Dash(
 server = app.server
 server.debug = True  # Enable debug mode
 
-cache = Cache(
-    server,
-    config={
+# Redis lets multiple server workers share cached UMAP results; without it
+# fall back to the per-host filesystem cache
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    cache_config = {
+        "CACHE_TYPE": "RedisCache",
+        "CACHE_REDIS_URL": REDIS_URL,
+        "CACHE_KEY_PREFIX": "umap:",
+        "CACHE_DEFAULT_TIMEOUT": 3600,
+    }
+else:
+    cache_config = {
         "CACHE_TYPE": "FileSystemCache",
         "CACHE_DIR": "./.flask_cache",
         "CACHE_DEFAULT_TIMEOUT": 3600,
         "CACHE_THRESHOLD": 100,
     }
-)
+
+cache = Cache(server, config=cache_config)
 
 df = load_phenobase_data()
 metadata = extract_metadata_columns(df)
@@ -68,51 +144,195 @@ app.layout = create_layout(
 
 register_callbacks(app, df, cache)
 
+# The layout never changes after startup, so it is serialized once here
+# instead of by Dash on every page load. The ETag also lets
+# compress_response keep its compressed body.
+LAYOUT_PATH = app.config.routes_pathname_prefix + "_dash-layout"
+LAYOUT_JSON = to_json_plotly(app.layout)
+LAYOUT_ETAG = f'"{hashlib.sha1(LAYOUT_JSON.encode()).hexdigest()}"'
+
+
+@server.before_request
+async def serve_prebuilt_layout():
+    """Answer layout requests with the JSON serialized at startup."""
+    if request.path == LAYOUT_PATH:
+        return server.response_class(LAYOUT_JSON, mimetype="application/json", headers={"ETag": LAYOUT_ETAG})
+    return None
+
+# Image paths (relative to data/) listed in the CSV; serve_image only answers
+# for these, and the CSV monitor adds paths from newly appended rows
+PATCH_COLUMNS = [c for c in df.columns if c.startswith("patches_2d_") and c.endswith("_path")]
+valid_images = set(df[PATCH_COLUMNS].stack().dropna().astype(str))
+
 
 @server.route("/images/<path:image_path>")
 async def serve_image(image_path):
     """Serve image files from the data directory."""
-    base_path = Path("data").absolute()
-    full_path = base_path / image_path
-    if not full_path.exists() or not full_path.is_relative_to(base_path):
+    # Unknown paths are rejected with a hash lookup, without touching the disk
+    if image_path not in valid_images:
+        return "Image not found", 404
+    full_path = IMAGE_BASE + image_path
+    if not os.path.isfile(full_path):
         return "Image not found", 404
-    return await quart_send_file(full_path, mimetype="image/png")
+    if IMAGE_ACCEL_REDIRECT_PREFIX:
+        return "", 200, {
+            "X-Accel-Redirect": f"{IMAGE_ACCEL_REDIRECT_PREFIX}{image_path}",
+            "Content-Type": "image/png",
+        }
+    # Conditional responses let repeat thumbnail loads revalidate with a 304
+    response = await quart_send_file(
+        full_path,
+        mimetype="image/png",
+        conditional=True,
+        cache_timeout=IMAGE_CACHE_MAX_AGE,
+    )
+    response.response.buffer_size = IMAGE_CHUNK_SIZE
+    return response
+
+
+# Compressed bodies of static responses, keyed by (cache key, encoding), so
+# each is compressed once per process. Responses with an ETag (the layout,
+# unversioned assets) are keyed by it; Dash serves its fingerprinted script
+# bundles without one, so those are keyed by their path
+_compressed_static = {}
+COMPONENT_SUITES_PATH = app.config.routes_pathname_prefix + "_dash-component-suites/"
+
+
+def _compress(body, encoding):
+    """Compress a response body with the given Content-Encoding."""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def _static_cache_key(etag):
+    """Key for _compressed_static, or None if the body may differ per request."""
+    if etag:
+        return etag
+    if request.path.startswith(COMPONENT_SUITES_PATH) and check_fingerprint(request.path)[1]:
+        return request.path
+    return None
+
+
+@server.after_request
+async def compress_response(response):
+    """Compress text responses (layout, callback JSON, scripts) for clients that accept it."""
+    if (
+        response.status_code != 200
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESS_MIMETYPES
+        or not isinstance(response.response, DataBody)
+    ):
+        return response
+    accepted = request.headers.get("Accept-Encoding", "")
+    if brotli is not None and "br" in accepted:
+        encoding = "br"
+    elif "gzip" in accepted:
+        encoding = "gzip"
+    else:
+        return response
+    body = await response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+
+    etag = response.headers.get("ETag")
+    cache_key = _static_cache_key(etag)
+    if etag:
+        # The compressed body gets its own validator; Dash only compares
+        # If-None-Match with the identity ETag, so revalidation is answered here
+        etag = f'{etag[:-1]}-{ETAG_ENCODING_SUFFIX[encoding]}"'
+        if request.if_none_match.contains_weak(unquote_etag(etag)[0]):
+            return server.response_class("", status=304, headers={"ETag": etag, "Vary": "Accept-Encoding"})
+
+    compressed = _compressed_static.get((cache_key, encoding)) if cache_key else None
+    if compressed is None:
+        # Off the event loop: compressing a large bundle takes tens of milliseconds
+        compressed = await asyncio.get_running_loop().run_in_executor(None, _compress, body, encoding)
+        if cache_key:
+            _compressed_static[(cache_key, encoding)] = compressed
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    if etag:
+        response.headers["ETag"] = etag
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+async def _client_writer(client, queue, handler_task):
+    """Drain a client's outbound queue onto its socket."""
+    try:
+        while True:
+            message = await queue.get()
+            await asyncio.wait_for(client.send(message), timeout=CLIENT_SEND_TIMEOUT)
+    except Exception as e:
+        print(f"[WebSocket] Error sending to client: {e!r}")
+        # Tear down the connection; ws_endpoint's cleanup unregisters it
+        handler_task.cancel()
 
 
 @server.websocket("/ws")
 async def ws_endpoint():
     """WebSocket endpoint for real-time notifications."""
     client = websocket._get_current_object()
-    connected_clients.add(client)
+    if len(connected_clients) >= MAX_CONNECTIONS:
+        print(f"[WebSocket] Connection limit ({MAX_CONNECTIONS}) reached, rejecting client")
+        await websocket.accept()
+        await websocket.close(1013)
+        return
+    queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+    handler_task = asyncio.current_task()
+    writer_task = asyncio.create_task(_client_writer(client, queue, handler_task))
+    connected_clients[client] = (queue, handler_task)
     print(f"[WebSocket] Client connected. Total: {len(connected_clients)}")
     try:
         while True:
-            # Keep connection alive by waiting for any message
+            # Inbound frames carry nothing and are discarded unread; liveness
+            # comes from the server's protocol pings, so clients never need
+            # to send keepalives
             await websocket.receive()
     except asyncio.CancelledError:
         pass
     finally:
-        connected_clients.discard(client)
+        writer_task.cancel()
+        connected_clients.pop(client, None)
         print(f"[WebSocket] Client disconnected. Total: {len(connected_clients)}")
 
 
+def _dumps(payload):
+    """Serialize a WebSocket payload to compact JSON text."""
+    if orjson is not None:
+        # Also handles numpy scalars; decoded because the client expects text frames
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(payload, separators=(',', ':'))
+
+
 async def broadcast_new_images(count, total, new_rows_info=None):
     """Broadcast new image notification to all connected clients."""
     if not connected_clients:
         return
-    message = json.dumps({
+    # Serialize once for every client; compact separators shrink the frame
+    # that each connection has to encode (and deflate, if negotiated)
+    message = _dumps({
         'type': 'new_image',
         'count': count,
         'total': total,
         'images': new_rows_info or []
     })
     print(f"[WebSocket] Broadcasting to {len(connected_clients)} clients: {count} new images")
-    for client in list(connected_clients):
+
+    # Enqueue only; each client's writer task does the actual send, so a
+    # slow peer backs up its own queue instead of stalling the broadcast
+    # Iterate the registry directly; stalled clients are dropped afterwards
+    stalled = []
+    for client, (queue, handler_task) in connected_clients.items():
         try:
-            await client.send(message)
-        except Exception as e:
-            print(f"[WebSocket] Error sending to client: {e}")
-            connected_clients.discard(client)
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            stalled.append((client, handler_task))
+    for client, handler_task in stalled:
+        print("[WebSocket] Client queue full, disconnecting slow client")
+        connected_clients.pop(client, None)
+        handler_task.cancel()
 
 
 class CSVMonitorHandler(FileSystemEventHandler):
@@ -122,40 +342,90 @@ class CSVMonitorHandler(FileSystemEventHandler):
         self.csv_path = csv_path
         self.last_count = initial_count
         self.loop = loop
-        self.last_modified = time.time()
+        self.last_modified = time.monotonic()
+        # Set once the platform delivers close-after-write events (inotify);
+        # from then on modify events are redundant and ignored
+        self._close_events_seen = False
+        # Incremental reader state: column names and bytes already consumed
+        self._header = self._read_header()
+        self._offset = os.path.getsize(csv_path)
+        # New rows waiting for the next coalesced broadcast
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        # True from the first queued row until the flush takes the batch;
+        # guarded by _pending_lock so only that first row wakes the loop
+        self._flush_armed = False
+
+    def _read_header(self):
+        """Read column names from the second line (the first holds category labels)."""
+        with open(self.csv_path, newline='') as f:
+            f.readline()
+            return next(csv.reader([f.readline()]))
+
+    def _read_appended_rows(self):
+        """Parse only the complete lines appended since the last read."""
+        with open(self.csv_path, 'rb') as f:
+            f.seek(self._offset)
+            new_bytes = f.read()
+        # Leave a partially written trailing line for the next event
+        end = new_bytes.rfind(b'\n') + 1
+        self._offset += end
+        lines = new_bytes[:end].decode('utf-8').splitlines()
+        return [dict(zip(self._header, values)) for values in csv.reader(lines) if values]
+
+    def _rebaseline(self):
+        """Re-read the header and count complete data rows without parsing them."""
+        self._header = self._read_header()
+        with open(self.csv_path, 'rb') as f:
+            data = f.read()
+        self._offset = data.rfind(b'\n') + 1
+        # Two header lines precede the data rows
+        return max(data.count(b'\n', 0, self._offset) - 2, 0)
+
+    def on_closed(self, event):
+        """A writer closed the CSV, so its append is complete - no debounce needed."""
+        if not event.src_path.endswith('phenobase.csv'):
+            return
+        self._close_events_seen = True
+        self._process_changes()
 
     def on_modified(self, event):
-        if not event.src_path.endswith('phenobase.csv'):
+        """Fallback for platforms whose observer doesn't emit close events."""
+        if self._close_events_seen or not event.src_path.endswith('phenobase.csv'):
             return
 
         # Debounce
-        current_time = time.time()
+        current_time = time.monotonic()
         if current_time - self.last_modified < 0.5:
             return
         self.last_modified = current_time
+        self._process_changes()
 
+    def _process_changes(self):
+        """Pick up rows appended since the last read and queue them for broadcast."""
         try:
-            df_check = pd.read_csv(self.csv_path, skiprows=[0])
-            current_count = len(df_check)
-
-            # Handle reset: if count decreased, update baseline
-            if current_count < self.last_count:
+            # Handle reset: file shrank, so re-baseline from a full read
+            if os.path.getsize(self.csv_path) < self._offset:
+                current_count = self._rebaseline()
                 print(f"[CSV Monitor] Reset detected: {self.last_count} -> {current_count}")
                 self.last_count = current_count
                 return
 
-            if current_count > self.last_count:
-                new_count = current_count - self.last_count
+            new_rows = self._read_appended_rows()
+            if new_rows:
+                new_count = len(new_rows)
+                current_count = self.last_count + new_count
 
                 # Extract info about new rows - use patch path as unique ID
-                new_rows = df_check.tail(new_count)
                 new_rows_info = []
-                for _, row in new_rows.iterrows():
+                for row in new_rows:
+                    valid_images.update(row[c] for c in PATCH_COLUMNS if row.get(c))
                     # Use the first patch path as unique identifier (it's unique per row)
                     patch_path = row.get('patches_2d_ch0_tl_exp_path', '')
+                    pos = row.get('pos')
                     info = {
                         'filename': row.get('czi_filename', 'unknown'),
-                        'pos': int(row.get('pos', -1)),
+                        'pos': int(pos) if pos else -1,
                         'patch_path': patch_path,  # Unique identifier
                     }
                     new_rows_info.append(info)
@@ -164,14 +434,49 @@ class CSVMonitorHandler(FileSystemEventHandler):
                 self.last_count = current_count
                 print(f"[CSV Monitor] Detected {new_count} new rows, total: {current_count}")
 
-                # Schedule async broadcast on the event loop
-                asyncio.run_coroutine_threadsafe(
-                    broadcast_new_images(new_count, current_count, new_rows_info),
-                    self.loop
-                )
+                # Queue for a coalesced broadcast on the event loop
+                with self._pending_lock:
+                    self._pending.extend(new_rows_info)
+                    wake_loop = not self._flush_armed
+                    self._flush_armed = True
+                if wake_loop:
+                    self.loop.call_soon_threadsafe(self._schedule_flush)
         except Exception as e:
             print(f"[CSV Monitor] Error: {e}")
 
+    def _schedule_flush(self):
+        """Arm the coalescing timer for a new batch (event loop thread)."""
+        self.loop.call_later(COALESCE_WINDOW, self._flush)
+
+    def _flush(self):
+        """Broadcast every row queued since the timer was armed as one message."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+            self._flush_armed = False
+        if pending:
+            self.loop.create_task(broadcast_new_images(len(pending), self.last_count, pending))
+
+
+_csv_observer = None  # the process-wide CSV watcher, once started
+
+
+def start_csv_monitor(csv_path, initial_count, loop):
+    """Start the CSV watcher, reusing the running one if it was already started.
+
+    Each watcher parses and broadcasts every change on its own, so a second
+    one would double the work and send every notification twice.
+    """
+    global _csv_observer
+    if _csv_observer is not None:
+        return _csv_observer
+    handler = CSVMonitorHandler(csv_path, initial_count, loop)
+    observer = Observer()
+    observer.schedule(handler, path=os.path.dirname(csv_path) or '.', recursive=False)
+    observer.start()
+    _csv_observer = observer
+    print(f"[CSV Monitor] Watching {csv_path}")
+    return observer
+
 
 if __name__ == "__main__":
     import signal
@@ -185,6 +490,7 @@ if __name__ == "__main__":
     print(f"Patch types: {', '.join(metadata['patch_types'])}")
     print(f"Coordinates: {', '.join(map(str, metadata['coordinates']))}")
     print("WebSocket endpoint: ws://127.0.0.1:8050/ws")
+    print(f"Event loop: {'uvloop' if uvloop is not None else 'asyncio'}")
     print("\nApplication running at: http://127.0.0.1:8050")
     print("Press Ctrl+C to stop")
     print("="*60 + "\n")
@@ -192,22 +498,25 @@ if __name__ == "__main__":
     config = Config()
     config.bind = ["0.0.0.0:8050"]
     config.use_reloader = False
-    config.loglevel = "DEBUG"
+    config.loglevel = LOG_LEVEL
     config.accesslog = "-"
     config.errorlog = "-"
+    # Hypercorn pings each socket on this interval, so half-closed clients
+    # error out of receive() and unregister instead of piling up
+    config.websocket_ping_interval = WS_PING_INTERVAL
 
-    loop = asyncio.new_event_loop()
+    loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
 
     # Shutdown event for graceful termination
     shutdown_event = asyncio.Event()
 
+    # JIT-compile the feature generator in the background so the first UMAP
+    # request does not pay for it
+    threading.Thread(target=prewarm_feature_kernel, name="numba-prewarm", daemon=True).start()
+
     # Start file watcher first (before signal handler references it)
-    handler = CSVMonitorHandler("data/phenobase.csv", len(df), loop)
-    observer = Observer()
-    observer.schedule(handler, path='data/', recursive=False)
-    observer.start()
-    print("[CSV Monitor] Watching data/phenobase.csv")
+    observer = start_csv_monitor("data/phenobase.csv", len(df), loop)
 
     # Track Ctrl+C presses for force quit
     ctrl_c_count = [0]  # Use list to avoid nonlocal issues
@@ -238,3 +547,4 @@ if __name__ == "__main__":
         observer.join()
         loop.close()
         print("[Server] Stopped.")
+        log_listener.stop()
@@ -1,18 +1,25 @@
 """Dash callbacks for interactive functionality."""
 
+import base64
 import json
+import logging
+import os
 from datetime import datetime
-from dash import Input, Output, State, callback, html, MATCH, ALL, ctx, no_update
+from functools import lru_cache
+from dash import Input, Output, State, Patch, callback, MATCH, ALL, ctx, no_update
 from dash.exceptions import PreventUpdate
-import plotly.graph_objects as go
-import plotly.express as px
+import plotly.io as pio
+from plotly.colors import qualitative
 import dash_mantine_components as dmc
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
-from src.data_loader import get_image_dataframe, generate_random_features, load_phenobase_data
+from src.data_loader import ROW_KEY_COLUMN, get_image_dataframe, generate_random_features, load_phenobase_data, load_position_count_range, load_position_rows
 from src.umap_processor import compute_umap_embedding, create_umap_dataframe
 
+logger = logging.getLogger(__name__)
+
 
 def register_callbacks(app, df_original, cache):
     """
@@ -24,6 +31,128 @@ def register_callbacks(app, df_original, cache):
         cache: Flask-Cache instance
     """
 
+    def get_cached_umap(cache_key, load_subset):
+        """
+        Return (df_subset, embedding, clusters) for cache_key, computing it on a miss.
+
+        The key is built from the callback inputs, so a hit costs one lookup
+        instead of hashing the DataFrame; load_subset is only called on a miss.
+        """
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+        df_subset = load_subset()
+        if len(df_subset) == 0:
+            return df_subset, None, None
+        features, clusters = generate_random_features(df_subset)
+        embedding = compute_umap_embedding(features)
+        result = (df_subset, embedding, clusters)
+        cache.set(cache_key, result, timeout=3600)
+        return result
+
+    def save_umap_df(store_key, umap_df):
+        """
+        Keep umap_df server-side; the data-store only holds the returned key.
+
+        Its summary statistics are computed once per key and stored next to it
+        for update_umap_stats.
+        """
+        if not cache.has(f"umap_stats:{store_key}"):
+            tp_arr = umap_df['time_period'].to_numpy()
+            cache.set(f"umap_stats:{store_key}", {
+                "n_images": len(umap_df),
+                "n_clusters": len(np.unique(umap_df['cluster'].to_numpy())),
+                "n_dates": len(np.unique(umap_df['date'].to_numpy())),
+                "time_periods": tuple(np.unique(tp_arr[tp_arr != 'N/A']).tolist()),
+            }, timeout=3600)
+        cache.set(f"umap_df:{store_key}", umap_df, timeout=3600)
+        return store_key
+
+    @lru_cache(maxsize=4)
+    def cached_umap_df(store_key):
+        """
+        Unpickle the DataFrame behind store_key once per process.
+
+        A data-store change fires the table, image grid and time filter
+        callbacks together; they share one copy instead of each reading the
+        file cache. Raises KeyError if it is missing, so misses are not cached.
+        """
+        umap_df = cache.get(f"umap_df:{store_key}")
+        if umap_df is None:
+            raise KeyError(store_key)
+        return umap_df
+
+    @lru_cache(maxsize=16)
+    def cached_table_view(view_key):
+        """
+        Return (rows, n_total, new_rows_set) for a table view, in display order.
+
+        view_key is the JSON of [view, sortModel, filterModel]; the view is
+        the table-view-store descriptor built by update_table. The grid asks
+        for one block of rows at a time, and these hits skip selecting,
+        filtering and sorting the rows again for every block. Raises KeyError
+        if the UMAP result is gone.
+        """
+        view, sort_model, filter_model = json.loads(view_key)
+        if "coordinate" in view:
+            # Live view: the position's rows as of the update, newest first.
+            # Timestamps are reassigned whenever the CSV changes, so rows
+            # appended since can sort anywhere; the CSV row ids up to the
+            # update's limit pick out the same rows
+            df = load_position_rows(view["coordinate"])
+            df = df[df['id'].to_numpy() < view["id_limit"]]
+            df = df[df.columns.intersection(TABLE_SOURCE_COLUMNS, sort=False)].iloc[::-1]
+            n_total = len(df)
+            new_rows_set = frozenset(view["new"])
+        else:
+            df = cached_umap_df(view["store_key"])
+            # Only the table's columns are needed, so drop the rest before any
+            # sorting or row selection copies them
+            df = df[df.columns.intersection(TABLE_SOURCE_COLUMNS, sort=False)]
+            n_total = len(df)
+            selection = view["selection"]
+            if selection is None:
+                df = df.sort_values('timestamp', ascending=False) if 'timestamp' in df.columns else df
+            elif selection == TABLE_HEAD_SELECTION:
+                df = df.head(20)
+            else:
+                df = df.iloc[selection]
+            new_rows_set = frozenset()
+        df = sort_table_rows(filter_table_rows(df, filter_model), sort_model)
+        return df, n_total, new_rows_set
+
+    def load_table_view(view, sort_model=(), filter_model=None):
+        """Fetch a table view through cached_table_view."""
+        return cached_table_view(json.dumps([view, list(sort_model), filter_model or {}], sort_keys=True))
+
+    def load_umap_df(store_key):
+        """Fetch the DataFrame behind a data-store key (None if missing or expired); treat it as read-only."""
+        if not store_key:
+            return None
+        try:
+            return cached_umap_df(store_key)
+        except KeyError:
+            return None
+
+    def get_umap_figure(store_key, title, load_subset):
+        """
+        Return the UMAP figure for store_key, or None if the subset is empty.
+
+        The finished figure dict is cached next to its DataFrame, so serving a
+        known result skips both the DataFrame assembly and the figure build.
+        """
+        fig = cache.get(f"umap_fig:{store_key}")
+        if fig is not None and cache.has(f"umap_df:{store_key}"):
+            return fig
+        df_subset, embedding, clusters = get_cached_umap(store_key, load_subset)
+        if len(df_subset) == 0:
+            return None
+        umap_df = create_umap_dataframe(df_subset, embedding, clusters)
+        fig, umap_df = build_umap_figure(umap_df, title)
+        save_umap_df(store_key, umap_df)
+        cache.set(f"umap_fig:{store_key}", fig, timeout=3600)
+        return fig
+
     # =========================================================================
     # WebSocket URL Setup
     # =========================================================================
@@ -44,21 +173,43 @@ def register_callbacks(app, df_original, cache):
     # =========================================================================
     # WebSocket Message Handler
     # =========================================================================
+    # Bursts of images are batched: messages are buffered client-side and
+    # written to ws-message-store together once no new one has arrived for
+    # 200 ms, so the store consumers run once per burst instead of per image.
+    # A steady stream is still flushed once the oldest buffered message is 1 s old.
     app.clientside_callback(
         """
         function(msg) {
             if (!msg) return window.dash_clientside.no_update;
-            console.log('[WebSocket] Received message:', msg);
             try {
                 const data = JSON.parse(msg.data);
-                console.log('[WebSocket] Parsed data:', data);
                 if (data.type === 'new_image') {
-                    return {
+                    const state = window.dash_clientside.wsBatch =
+                        window.dash_clientside.wsBatch || {messages: [], timer: null};
+                    state.messages.push({
                         count: data.count,
                         total: data.total,
                         timestamp: Date.now(),
                         images: data.images || []
+                    });
+                    const flush = function() {
+                        const batch = state.messages;
+                        state.messages = [];
+                        const last = batch[batch.length - 1];
+                        window.dash_clientside.set_props('ws-message-store', {data: {
+                            count: batch.reduce((n, m) => n + m.count, 0),
+                            total: last.total,
+                            timestamp: last.timestamp,
+                            images: [].concat(...batch.map(m => m.images)),
+                            batch: batch
+                        }});
                     };
+                    clearTimeout(state.timer);
+                    if (Date.now() - state.messages[0].timestamp >= 1000) {
+                        flush();
+                    } else {
+                        state.timer = setTimeout(flush, 200);
+                    }
                 }
             } catch(e) {
                 console.error('WebSocket parse error:', e);
@@ -70,304 +221,165 @@ def register_callbacks(app, df_original, cache):
         Input("ws", "message"),
     )
 
+    # =========================================================================
+    # Live Update Gate
+    # =========================================================================
+    # While paused, batches stop here in the browser, so the time series and
+    # table callbacks are never sent a request only to answer with no_update
+    app.clientside_callback(
+        """
+        function(wsData, frozen) {
+            if (!wsData || frozen) return window.dash_clientside.no_update;
+            return wsData;
+        }
+        """,
+        Output("ws-active-store", "data"),
+        Input("ws-message-store", "data"),
+        State("freeze-toggle", "checked"),
+        prevent_initial_call=True,
+    )
+
     # =========================================================================
     # Freeze Toggle - Update Live Indicator
     # =========================================================================
-    @app.callback(
+    # Pure display toggle, so it runs in the browser without a server round-trip
+    app.clientside_callback(
+        """
+        function(frozen) {
+            return frozen ? ['⏸ Paused', 'red'] : ['● Live', 'green'];
+        }
+        """,
         Output("live-indicator", "children"),
         Output("live-indicator", "color"),
         Input("freeze-toggle", "checked"),
     )
-    def update_freeze_indicator(frozen):
-        """Update the live indicator based on freeze state."""
-        if frozen:
-            return "⏸ Paused", "red"
-        return "● Live", "green"
 
     # =========================================================================
     # Notifications for New Data
     # =========================================================================
-    @app.callback(
+    # Built from the message alone, so it runs in the browser without a server round-trip
+    app.clientside_callback(
+        """
+        function(wsData, frozen) {
+            if (!wsData) return window.dash_clientside.no_update;
+
+            const count = wsData.count || 0;
+            const total = wsData.total || 0;
+            const images = 'image' + (count > 1 ? 's' : '');
+
+            return [{
+                action: 'show',
+                id: 'new-data-' + total,
+                title: frozen ? 'New Data (Paused)' : 'New Data Received',
+                message: frozen
+                    ? '+' + count + ' ' + images + ' - updates paused'
+                    : '+' + count + ' ' + images + ' added (total: ' + total + ')',
+                color: frozen ? 'orange' : 'green',
+                autoClose: 3000
+            }];
+        }
+        """,
         Output("notification-container", "sendNotifications"),
         Input("ws-message-store", "data"),
         State("freeze-toggle", "checked"),
         prevent_initial_call=True,
     )
-    def send_new_data_notification(ws_data, frozen):
-        """Send notification when new data arrives."""
-        if not ws_data:
-            return no_update
-
-        count = ws_data.get('count', 0)
-        total = ws_data.get('total', 0)
-
-        notification = {
-            "action": "show",
-            "id": f"new-data-{total}",
-            "title": "New Data Received",
-            "message": f"+{count} image{'s' if count > 1 else ''} added (total: {total})",
-            "color": "green" if not frozen else "orange",
-            "autoClose": 3000,
-        }
 
-        if frozen:
-            notification["title"] = "New Data (Paused)"
-            notification["message"] = f"+{count} image{'s' if count > 1 else ''} - updates paused"
+    # =========================================================================
+    # Pending Update Badge
+    # =========================================================================
+    # Follows pending-update-store in the browser; the server callbacks only
+    # set the flag
+    app.clientside_callback(
+        """
+        function(pending) {
+            return pending ? {display: 'inline-block'} : {display: 'none'};
+        }
+        """,
+        Output("pending-badge", "style"),
+        Input("pending-update-store", "data"),
+        prevent_initial_call=True,
+    )
 
-        return [notification]
+    # =========================================================================
+    # Event Count Badge
+    # =========================================================================
+    app.clientside_callback(
+        """
+        function(events) {
+            return String((events || []).length);
+        }
+        """,
+        Output("event-count-badge", "children"),
+        Input("event-log-store", "data"),
+        prevent_initial_call=True,
+    )
 
     # =========================================================================
-    # Event Log & Pending Update Indicator
+    # Event Log & Pending Update Flag
     # =========================================================================
     @app.callback(
         [
             Output("event-log-container", "children"),
-            Output("event-count-badge", "children"),
             Output("event-log-store", "data"),  # Persist events in store
             Output("pending-update-store", "data"),
-            Output("pending-badge", "style"),
-            Output("new-rows-store", "data"),
         ],
         Input("ws-message-store", "data"),
-        [
-            State("event-log-store", "data"),
-            State("pending-update-store", "data"),
-            State("new-rows-store", "data"),
-            State("freeze-toggle", "checked"),
-        ],
+        State("event-log-store", "data"),
         prevent_initial_call=True,
     )
-    def update_event_log(ws_data, existing_events, _pending, existing_new_rows, frozen):
-        """Update event log and show pending update indicator."""
+    def update_event_log(ws_data, existing_events):
+        """Update event log and flag the pending update."""
         if not ws_data:
-            return no_update, no_update, no_update, no_update, no_update, no_update
+            return no_update, no_update, no_update
 
-        # If frozen, only update event log but don't trigger other updates
-        count = ws_data.get('count', 0)
-        total = ws_data.get('total', 0)
-        images = ws_data.get('images', [])
+        # Messages arrive batched (see the WebSocket handler); older payloads
+        # without a batch are treated as a batch of one
+        batch = ws_data.get('batch') or [ws_data]
         timestamp = datetime.now().strftime("%H:%M:%S")
 
-        # Track ONLY the current batch of new filenames (not cumulative)
-        # This ensures only the most recently added rows are highlighted
-        new_row_filenames = [img.get('filename', '') for img in images]
-
-        # Create new event data (serializable for store)
-        new_event_data = {
-            "count": count,
-            "total": total,
-            "timestamp": timestamp,
-            "images": images,
-            "is_new": True,
-        }
+        # Create new event data (serializable for store), newest first
+        new_events = [
+            {
+                "count": msg.get('count', 0),
+                "total": msg.get('total', 0),
+                "timestamp": timestamp,
+                "images": msg.get('images', []),
+                "is_new": True,
+            }
+            for msg in reversed(batch)
+        ]
 
         # Get existing events or start fresh
-        if existing_events and isinstance(existing_events, list):
-            # Mark old events as not new
-            for evt in existing_events:
-                evt["is_new"] = False
-            # Keep last 15 events
-            all_events = [new_event_data] + existing_events[:14]
+        if not (existing_events and isinstance(existing_events, list)):
+            existing_events = []
+
+        # Render only the new events; every event of the current batch is highlighted
+        new_cards = [create_event_card(evt) for evt in new_events]
+        if existing_events:
+            # The older cards (one per stored event, both written only here)
+            # stay in the browser: patch the previous batch's highlight away,
+            # prepend the new cards and trim, instead of resending every card
+            event_components = Patch()
+            for i, evt in enumerate(existing_events):
+                if evt.get("is_new"):
+                    mark_event_card_seen(event_components[i])
+            for card in reversed(new_cards):
+                event_components.prepend(card)
+            for i in reversed(range(MAX_EVENTS, len(new_cards) + len(existing_events))):
+                del event_components[i]
         else:
-            all_events = [new_event_data]
-
-        # Render events as components
-        event_components = []
-        for i, evt in enumerate(all_events):
-            is_newest = (i == 0)
-            evt_images = evt.get('images', [])
-
-            # Build image details
-            image_details = []
-            for img in evt_images[:3]:  # Show max 3 images
-                image_details.append(
-                    dmc.Group(
-                        gap=4,
-                        children=[
-                            dmc.Badge(
-                                f"pos {img.get('pos', '?')}",
-                                size="xs",
-                                variant="dot",
-                                color="blue",
-                            ),
-                            dmc.Text(
-                                img.get('filename', 'unknown')[:25] + ('...' if len(img.get('filename', '')) > 25 else ''),
-                                size="xs",
-                                c="dimmed",
-                                style={"fontFamily": "monospace"},
-                            ),
-                        ]
-                    )
-                )
-            if len(evt_images) > 3:
-                image_details.append(
-                    dmc.Text(f"... and {len(evt_images) - 3} more", size="xs", c="dimmed", fs="italic")
-                )
-
-            event_components.append(
-                dmc.Paper(
-                    children=dmc.Stack(
-                        gap="xs",
-                        children=[
-                            dmc.Group(
-                                gap="xs",
-                                justify="space-between",
-                                children=[
-                                    dmc.Group(
-                                        gap="xs",
-                                        children=[
-                                            dmc.ThemeIcon(
-                                                children="📷",
-                                                color="green" if is_newest else "gray",
-                                                variant="filled" if is_newest else "light",
-                                                size="sm",
-                                                radius="xl",
-                                            ),
-                                            dmc.Text(
-                                                f"+{evt['count']} image{'s' if evt['count'] > 1 else ''}",
-                                                size="sm",
-                                                fw=600 if is_newest else 400,
-                                                c="green" if is_newest else "dark",
-                                            ),
-                                        ]
-                                    ),
-                                    dmc.Text(
-                                        evt['timestamp'],
-                                        size="xs",
-                                        c="dimmed",
-                                    ),
-                                ]
-                            ),
-                            # Image details
-                            dmc.Stack(
-                                gap=2,
-                                children=image_details,
-                            ) if image_details else None,
-                            dmc.Text(
-                                f"Total: {evt['total']} images",
-                                size="xs",
-                                c="dimmed",
-                            ),
-                        ]
-                    ),
-                    p="xs",
-                    radius="sm",
-                    withBorder=True,
-                    style={
-                        "backgroundColor": "var(--mantine-color-green-1)" if is_newest else "transparent",
-                        "borderColor": "var(--mantine-color-green-5)" if is_newest else "var(--mantine-color-gray-3)",
-                        "borderWidth": "2px" if is_newest else "1px",
-                        "transition": "all 0.3s ease",
-                    },
-                    className="new-event" if is_newest else "",
-                )
-            )
+            # Replaces the "Waiting for events..." placeholder
+            event_components = new_cards[:MAX_EVENTS]
 
-        event_count = len(all_events)
+        # Mark old events as not new
+        for evt in existing_events:
+            evt["is_new"] = False
+        # Keep the last MAX_EVENTS events
+        all_events = (new_events + existing_events)[:MAX_EVENTS]
 
-        # Show the pending badge when new data arrives (even if frozen - user should know)
-        # Only pass the CURRENT batch of new filenames for highlighting
-        return event_components, str(event_count), all_events, not frozen, {"display": "inline-block"}, new_row_filenames
-
-    # =========================================================================
-    # Live Statistics Update
-    # =========================================================================
-    @app.callback(
-        Output("stats-display", "children", allow_duplicate=True),
-        Input("ws", "message"),
-        [
-            State("patch-dropdown", "value"),
-            State("coord-dropdown", "value"),
-            State("freeze-toggle", "checked"),
-        ],
-        prevent_initial_call=True,
-    )
-    def update_live_stats(ws_message, _patch_type, coordinate, frozen):
-        """Update statistics when new data arrives via WebSocket."""
-        if not ws_message or not coordinate or frozen:
-            return no_update
-
-        try:
-            ws_data = json.loads(ws_message.get('data', '{}'))
-            if ws_data.get('type') != 'new_image':
-                return no_update
-        except (json.JSONDecodeError, AttributeError):
-            return no_update
-
-        # Reload fresh data
-        df_fresh = load_phenobase_data()
-        coordinate_int = int(coordinate)
-        filtered_df = df_fresh[df_fresh['pos'] == coordinate_int]
-
-        if len(filtered_df) == 0:
-            return no_update
-
-        # Get unique dates and time periods
-        dates = filtered_df['date'].unique() if 'date' in filtered_df.columns else []
-        time_periods = filtered_df['time_period'].unique() if 'time_period' in filtered_df.columns else []
-
-        stats_display = dmc.Stack(
-            gap="sm",
-            children=[
-                dmc.Group(
-                    gap="xs",
-                    children=[
-                        dmc.ThemeIcon(size="lg", radius="md", variant="light", color="blue", children="📊"),
-                        dmc.Stack(
-                            gap=0,
-                            children=[
-                                dmc.Text(str(len(filtered_df)), fw=700, size="xl", c="blue"),
-                                dmc.Text("Total Images", size="xs", c="dimmed"),
-                            ]
-                        ),
-                    ]
-                ),
-                dmc.Divider(),
-                dmc.Group(
-                    gap="xs",
-                    children=[
-                        dmc.ThemeIcon(size="lg", radius="md", variant="light", color="orange", children="🔄"),
-                        dmc.Stack(
-                            gap=0,
-                            children=[
-                                dmc.Text("LIVE", fw=700, size="xl", c="orange"),
-                                dmc.Text("Refresh UMAP for clusters", size="xs", c="dimmed"),
-                            ]
-                        ),
-                    ]
-                ),
-                dmc.Divider(),
-                dmc.Group(
-                    gap="xs",
-                    children=[
-                        dmc.ThemeIcon(size="lg", radius="md", variant="light", color="teal", children="📅"),
-                        dmc.Stack(
-                            gap=0,
-                            children=[
-                                dmc.Text(str(len(dates)), fw=700, size="xl", c="teal"),
-                                dmc.Text("Unique Dates", size="xs", c="dimmed"),
-                            ]
-                        ),
-                    ]
-                ),
-                dmc.Divider(),
-                dmc.Stack(
-                    gap="xs",
-                    children=[
-                        dmc.Text("Time Periods:", fw=500, size="sm"),
-                        dmc.Group(
-                            gap="xs",
-                            children=[
-                                dmc.Badge(tp, size="sm", variant="light") for tp in time_periods if tp != 'N/A'
-                            ]
-                        ),
-                    ]
-                ) if len([tp for tp in time_periods if tp != 'N/A']) > 0 else None,
-            ]
-        )
-
-        print(f"[Stats] Updated live stats: {len(filtered_df)} images", flush=True)
-        return stats_display
+        # Flag pending data when new data arrives (even if frozen - user should know)
+        return event_components, all_events, True
 
     # =========================================================================
     # UMAP Plot - Manual Update Only
@@ -376,154 +388,64 @@ def register_callbacks(app, df_original, cache):
         [
             Output("umap-plot", "figure"),
             Output("data-store", "data"),
-            Output("features-store", "data"),
-            Output("stats-display", "children"),
             Output("pending-update-store", "data", allow_duplicate=True),
-            Output("pending-badge", "style", allow_duplicate=True),
         ],
         [
             Input("patch-dropdown", "value"),
             Input("coord-dropdown", "value"),
             Input("update-umap-btn", "n_clicks"),
         ],
+        State("data-store", "data"),
         prevent_initial_call='initial_duplicate',
+        running=[(Output("loading-umap", "visible"), True, False)],
     )
-    def update_umap_and_data(patch_type, coordinate, update_clicks):
+    def update_umap_and_data(patch_type, coordinate, update_clicks, stored_data):
         """Update UMAP plot - triggered by filter change or Update button."""
+        # Keep the current plot while a dropdown is cleared
         if not patch_type or coordinate is None:
-            empty_fig = go.Figure()
-            empty_fig.update_layout(
-                title="Select patch type and coordinate",
-                xaxis_title="UMAP 1",
-                yaxis_title="UMAP 2",
-            )
-            return empty_fig, None, None, "No data selected", False, {"display": "none"}
+            raise PreventUpdate
 
         coordinate = int(coordinate)
 
-        # Always reload from CSV to get latest data
+        # Always reload from CSV to get latest data; the row count for this
+        # coordinate busts the cache when new data is added
         df_current = load_phenobase_data()
-        filtered_df = get_image_dataframe(df_current, patch_type, coordinate)
-
-        if len(filtered_df) == 0:
-            empty_fig = go.Figure()
-            empty_fig.update_layout(
-                title="No data available",
-                xaxis_title="UMAP 1",
-                yaxis_title="UMAP 2",
-            )
-            return empty_fig, None, None, "No images found", False, {"display": "none"}
-
-        # Include row count in cache key to bust cache when new data is added
-        cache_key = f"umap_{patch_type}_{coordinate}_{len(filtered_df)}"
-
-        @cache.memoize(timeout=3600)
-        def get_cached_umap(key, df_subset):
-            features, clusters = generate_random_features(df_subset)
-            embedding = compute_umap_embedding(features)
-            return embedding, clusters
-
-        embedding, clusters = get_cached_umap(cache_key, filtered_df)
-        umap_df = create_umap_dataframe(filtered_df, embedding, clusters)
-
-        fig = px.scatter(
-            umap_df,
-            x="umap_x",
-            y="umap_y",
-            color="cluster",
-            hover_data=["czi_filename", "pos", "date", "time_period"],
-            title=f"UMAP: {patch_type} (position {coordinate})",
-            color_discrete_sequence=px.colors.qualitative.Plotly,
-            custom_data=["czi_filename", "cluster", "date", "time_period"],
-        )
+        n_rows = int((df_current['pos'] == coordinate).sum())
+        cache_key = f"umap_{patch_type}_{coordinate}_{n_rows}"
+
+        # The plot already shows exactly this result: nothing to redraw. The
+        # Update button always redraws (from the cached figure), since a time
+        # filter can replace the plot without changing the data-store, e.g.
+        # with "No data in range"
+        if stored_data == cache_key and ctx.triggered_id != "update-umap-btn":
+            raise PreventUpdate
 
-        fig.update_traces(
-            marker=dict(size=10, opacity=0.7, line=dict(width=1, color='white')),
-            hovertemplate=(
-                "<b>%{customdata[0]}</b><br>"
-                "Cluster: %{customdata[1]}<br>"
-                "Date: %{customdata[2]}<br>"
-                "Time: %{customdata[3]}<br>"
-                "UMAP X: %{x:.2f}<br>"
-                "UMAP Y: %{y:.2f}<br>"
-                "<extra></extra>"
-            ),
+        fig = get_umap_figure(
+            cache_key,
+            f"UMAP: {patch_type} (position {coordinate})",
+            lambda: get_image_dataframe(df_current, patch_type, coordinate),
         )
 
-        fig.update_layout(
-            clickmode="event+select",
-            dragmode="lasso",
-            hovermode="closest",
-            height=500,
-            margin=dict(l=20, r=20, t=40, b=20),
-        )
+        if fig is None:
+            return NO_DATA_FIGURE, None, False
 
-        n_clusters = len(umap_df['cluster'].unique())
-        dates = umap_df['date'].unique()
-        time_periods = umap_df['time_period'].unique()
+        # Clear pending update flag, which hides the badge
+        return fig, cache_key, False
 
-        stats_display = dmc.Stack(
-            gap="sm",
-            children=[
-                dmc.Group(
-                    gap="xs",
-                    children=[
-                        dmc.ThemeIcon(size="lg", radius="md", variant="light", color="blue", children="📊"),
-                        dmc.Stack(
-                            gap=0,
-                            children=[
-                                dmc.Text(str(len(filtered_df)), fw=700, size="xl", c="blue"),
-                                dmc.Text("Total Images", size="xs", c="dimmed"),
-                            ]
-                        ),
-                    ]
-                ),
-                dmc.Divider(),
-                dmc.Group(
-                    gap="xs",
-                    children=[
-                        dmc.ThemeIcon(size="lg", radius="md", variant="light", color="grape", children="🎨"),
-                        dmc.Stack(
-                            gap=0,
-                            children=[
-                                dmc.Text(str(n_clusters), fw=700, size="xl", c="grape"),
-                                dmc.Text("Clusters", size="xs", c="dimmed"),
-                            ]
-                        ),
-                    ]
-                ),
-                dmc.Divider(),
-                dmc.Group(
-                    gap="xs",
-                    children=[
-                        dmc.ThemeIcon(size="lg", radius="md", variant="light", color="teal", children="📅"),
-                        dmc.Stack(
-                            gap=0,
-                            children=[
-                                dmc.Text(str(len(dates)), fw=700, size="xl", c="teal"),
-                                dmc.Text("Unique Dates", size="xs", c="dimmed"),
-                            ]
-                        ),
-                    ]
-                ),
-                dmc.Divider(),
-                dmc.Stack(
-                    gap="xs",
-                    children=[
-                        dmc.Text("Time Periods:", fw=500, size="sm"),
-                        dmc.Group(
-                            gap="xs",
-                            children=[
-                                dmc.Badge(tp, size="sm", variant="light") for tp in time_periods if tp != 'N/A'
-                            ]
-                        ),
-                    ]
-                ) if len([tp for tp in time_periods if tp != 'N/A']) > 0 else None,
-            ]
-        )
-
-        # Clear pending update flag and hide badge
-        return fig, umap_df.to_dict("records"), None, stats_display, False, {"display": "none"}
+    # =========================================================================
+    # UMAP Statistics - follow the data store
+    # =========================================================================
+    @app.callback(
+        Output("stats-display", "children"),
+        Input("data-store", "data"),
+        prevent_initial_call=True,
+    )
+    def update_umap_stats(stored_data):
+        """Show the precomputed statistics for the current UMAP result."""
+        stats = cache.get(f"umap_stats:{stored_data}") if stored_data else None
+        if stats is None:
+            return "No data selected"
+        return create_umap_stats(**stats)
 
     # =========================================================================
     # Time Series Plot - Auto-updates with smooth transitions
@@ -532,201 +454,186 @@ def register_callbacks(app, df_original, cache):
         [
             Output("timeseries-plot", "figure"),
             Output("timeseries-store", "data"),
+            # Live stats are derived from the same rows on WebSocket updates
+            Output("stats-display", "children", allow_duplicate=True),
         ],
         [
             Input("patch-dropdown", "value"),
             Input("coord-dropdown", "value"),
-            Input("ws", "message"),  # Direct WebSocket input for live updates
+            Input("ws-active-store", "data"),  # New images, only forwarded while not paused
             Input("update-umap-btn", "n_clicks"),  # Manual refresh trigger
         ],
         [
-            State("freeze-toggle", "checked"),
             State("data-store", "data"),  # Changed to State to avoid circular updates
         ],
+        prevent_initial_call="initial_duplicate",
     )
-    def update_time_series(patch_type, coordinate, ws_message, n_clicks, frozen, _stored_data):
-        """Update time series - auto-refreshes when new data arrives."""
+    def update_time_series(patch_type, coordinate, ws_data, n_clicks, _stored_data):
+        """Update time series (and live statistics on new data) - auto-refreshes when new data arrives."""
         triggered_id = ctx.triggered_id
-        print(f"[TimeSeries] *** CALLBACK TRIGGERED *** by: {triggered_id}", flush=True)
-        print(f"[TimeSeries] ws_message={ws_message is not None}, patch_type={patch_type}, coord={coordinate}, frozen={frozen}", flush=True)
+        logger.debug("[TimeSeries] Triggered by: %s", triggered_id)
+        logger.debug("[TimeSeries] ws_data=%s, patch_type=%s, coord=%s", ws_data is not None, patch_type, coordinate)
 
         # Variable to store new filenames for highlighting
         ws_new_filenames = []
 
         # Handle WebSocket messages
-        if triggered_id == "ws" and ws_message:
-            # Check freeze state
-            if frozen:
-                print("[TimeSeries] Frozen - skipping WebSocket update", flush=True)
-                return no_update, no_update
-            # Parse WebSocket message directly
-            try:
-                ws_data = json.loads(ws_message.get('data', '{}'))
-                if ws_data.get('type') != 'new_image':
-                    print("[TimeSeries] Not a new_image message, skipping", flush=True)
-                    return no_update, no_update
-                # Extract unique patch paths from WebSocket message (czi_filename is NOT unique per row)
-                ws_new_filenames = [img.get('patch_path', '') for img in ws_data.get('images', [])]
-                print(f"[TimeSeries] New patch paths from WS: {ws_new_filenames}", flush=True)
-            except (json.JSONDecodeError, AttributeError) as e:
-                print(f"[TimeSeries] Failed to parse WebSocket message: {e}", flush=True)
-                return no_update, no_update
+        if triggered_id == "ws-active-store" and ws_data:
+            # Extract unique patch paths from WebSocket message (czi_filename is NOT unique per row)
+            ws_new_filenames = [img.get('patch_path', '') for img in ws_data.get('images', [])]
+            logger.debug("[TimeSeries] New patch paths from WS: %s", ws_new_filenames)
 
         # Always reload fresh data when coordinate is available
         if coordinate:
-            print(f"[TimeSeries] Loading fresh data for coord={coordinate}", flush=True)
-            df_fresh = load_phenobase_data()
+            logger.debug("[TimeSeries] Loading fresh data for coord=%s", coordinate)
+            # Already ordered by timestamp
             coordinate_int = int(coordinate)
-            df = df_fresh[df_fresh['pos'] == coordinate_int].copy()
-            print(f"[TimeSeries] Filtered: {len(df)} rows", flush=True)
+            # A shallow copy: only the is_new column is added below
+            df = load_position_rows(coordinate_int).copy(deep=False)
+            logger.debug("[TimeSeries] Filtered: %d rows", len(df))
 
             if len(df) == 0:
-                print("[TimeSeries] No data after filtering", flush=True)
-                return go.Figure(), None
+                logger.debug("[TimeSeries] No data after filtering")
+                return EMPTY_FIGURE, None, no_update
 
             if 'timestamp' not in df.columns or 'object_count' not in df.columns:
-                print("[TimeSeries] ERROR: Missing columns!", flush=True)
-                return go.Figure(), None
-
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
+                logger.error("[TimeSeries] Missing timestamp/object_count columns")
+                return EMPTY_FIGURE, None, no_update
         else:
-            print("[TimeSeries] Missing coordinate", flush=True)
-            return go.Figure(), None
+            logger.debug("[TimeSeries] Missing coordinate")
+            return EMPTY_FIGURE, None, no_update
+
+        # A WebSocket update also refreshes the live statistics from these rows
+        stats = no_update
+        if triggered_id == "ws-active-store":
+            dates = np.unique(df['date'].to_numpy()) if 'date' in df.columns else []
+            if 'time_period' in df.columns:
+                tp_arr = df['time_period'].to_numpy()
+                time_periods = tuple(np.unique(tp_arr[tp_arr != 'N/A']))
+            else:
+                time_periods = ()
+            stats = create_live_stats(len(df), len(dates), time_periods)
+            logger.debug("[Stats] Updated live stats: %d images", len(df))
 
         try:
-            df = df.sort_values('timestamp')
-
-            print(f"[TimeSeries] Building plot with {len(df)} points", flush=True)
+            logger.debug("[TimeSeries] Building plot with %d points", len(df))
 
             # Mark new points for highlighting - use patch paths from WebSocket message
             # Only highlight if we have new patch paths from the current WebSocket trigger
             new_rows_set = set(ws_new_filenames) if ws_new_filenames else set()
             # Use the first patch path column for matching (it's unique per row)
-            patch_col = 'patches_2d_ch0_tl_exp_path'
-            if patch_col in df.columns:
-                df['is_new'] = df[patch_col].isin(new_rows_set)
+            if ROW_KEY_COLUMN in df.columns:
+                df['is_new'] = new_row_mask(df[ROW_KEY_COLUMN], new_rows_set)
             else:
                 df['is_new'] = False
-            print(f"[TimeSeries] Marking {df['is_new'].sum()} points as new out of {len(df)}", flush=True)
+            logger.debug("[TimeSeries] Marking %d points as new out of %d", df['is_new'].sum(), len(df))
 
             # Split into old and new data for different styling
             df_old = df[~df['is_new']]
             df_new = df[df['is_new']]
 
-            # Create scatter plot with two traces
-            fig = go.Figure()
-
-            # Old points (regular styling)
+            # Only the traces, ranges and title change per call; the rest of
+            # the figure comes from the prebuilt TIMESERIES_LAYOUT
+            data = []
+            # WebGL draws large sets in one call instead of one SVG node per point
+            trace_type = "scattergl" if len(df) > TIMESERIES_WEBGL_MIN_POINTS else "scatter"
+
+            # Old points (regular styling); past TIMESERIES_MAX_POINTS they are
+            # averaged into that many time bins, which is all the plot can show
+            if len(df_old) > TIMESERIES_MAX_POINTS:
+                binned = bin_time_series(df_old, TIMESERIES_MAX_POINTS)
+                old_points = {
+                    "x": epoch_ms_array(binned['timestamp'].to_numpy()),
+                    "y": typed_array(binned['object_count'].to_numpy()),
+                    "customdata": binned['n_images'].to_numpy(),
+                    "hovertemplate": TIMESERIES_BINNED_HOVERTEMPLATE,
+                }
+            else:
+                old_points = {
+                    "x": epoch_ms_array(df_old['timestamp'].to_numpy()),
+                    "y": typed_array(df_old['object_count'].to_numpy()),
+                    "customdata": df_old[TIMESERIES_CUSTOMDATA_COLUMNS].to_numpy(),
+                    "hovertemplate": TIMESERIES_HOVERTEMPLATE,
+                }
             if len(df_old) > 0:
-                fig.add_trace(go.Scatter(
-                    x=df_old['timestamp'],
-                    y=df_old['object_count'],
-                    mode='markers',
-                    name='Images',
-                    marker=dict(
-                        size=8,
-                        color=df_old['object_count'],
-                        colorscale='Viridis',
-                        showscale=True,
-                        colorbar=dict(title="Objects"),
-                        opacity=0.7,
-                        line=dict(width=1, color='white')
-                    ),
-                    customdata=df_old[['czi_filename', 'id']] if 'id' in df_old.columns else df_old[['czi_filename']],
-                    hovertemplate=(
-                        "<b>%{customdata[0]}</b><br>"
-                        "Time: %{x}<br>"
-                        "Objects: %{y}<br>"
-                        "<extra></extra>"
-                    ),
-                ))
+                data.append({
+                    "type": trace_type,
+                    "mode": "markers",
+                    "name": "Images",
+                    **old_points,
+                    "marker": {
+                        "size": 8,
+                        "color": old_points["y"],
+                        "colorscale": "Viridis",
+                        "showscale": True,
+                        "colorbar": {"title": {"text": "Objects"}},
+                        "opacity": 0.7,
+                        "line": {"width": 1, "color": "white"},
+                    },
+                })
 
             # New points (subtle highlight: slightly larger with white glow border)
             if len(df_new) > 0:
-                fig.add_trace(go.Scatter(
-                    x=df_new['timestamp'],
-                    y=df_new['object_count'],
-                    mode='markers',
-                    name='New',
-                    marker=dict(
-                        size=11,  # Slightly larger
-                        color=df_new['object_count'],
-                        colorscale='Viridis',
-                        showscale=False,
-                        opacity=1.0,
-                        line=dict(width=2, color='rgba(255,255,255,0.9)'),  # White glow border
-                    ),
-                    customdata=df_new[['czi_filename', 'id']] if 'id' in df_new.columns else df_new[['czi_filename']],
-                    hovertemplate=(
-                        "<b>%{customdata[0]}</b> (new)<br>"
-                        "Time: %{x}<br>"
-                        "Objects: %{y}<br>"
-                        "<extra></extra>"
-                    ),
-                ))
+                data.append({
+                    "type": trace_type,
+                    "mode": "markers",
+                    "name": "New",
+                    "x": epoch_ms_array(df_new['timestamp'].to_numpy()),
+                    "y": typed_array(df_new['object_count'].to_numpy()),
+                    "marker": {
+                        "size": 11,  # Slightly larger
+                        "color": typed_array(df_new['object_count'].to_numpy()),
+                        "colorscale": "Viridis",
+                        "showscale": False,
+                        "opacity": 1.0,
+                        "line": {"width": 2, "color": "rgba(255,255,255,0.9)"},  # White glow border
+                    },
+                    "customdata": df_new[TIMESERIES_CUSTOMDATA_COLUMNS].to_numpy(),
+                    "hovertemplate": TIMESERIES_NEW_HOVERTEMPLATE,
+                })
 
             # Set explicit axis ranges based on data to ensure new points are visible
-            x_min = df['timestamp'].min()
-            x_max = df['timestamp'].max()
-            y_min = df['object_count'].min()
-            y_max = df['object_count'].max()
+            # (rows are in timestamp order; count ranges are precomputed per position)
+            x_min = df['timestamp'].iloc[0]
+            x_max = df['timestamp'].iloc[-1]
+            y_min, y_max = load_position_count_range(coordinate_int)
 
             # Add small padding to ranges
             x_padding = pd.Timedelta(seconds=30)
             y_padding = (y_max - y_min) * 0.1 if y_max > y_min else 1
 
-            fig.update_xaxes(
-                rangeslider_visible=True,
-                range=[x_min - x_padding, x_max + x_padding],  # Explicit range
-                rangeselector=dict(
-                    buttons=list([
-                        dict(count=1, label="1m", step="minute", stepmode="backward"),
-                        dict(count=5, label="5m", step="minute", stepmode="backward"),
-                        dict(count=10, label="10m", step="minute", stepmode="backward"),
-                        dict(count=30, label="30m", step="minute", stepmode="backward"),
-                        dict(count=60, label="60m", step="minute", stepmode="backward"),
-                        dict(step="all", label="All"),
-                    ]),
-                    bgcolor="#f1f3f5",
-                    activecolor="#1971c2",
-                ),
-                rangeslider=dict(bgcolor="#f8f9fa", thickness=0.05),
-            )
-
-            fig.update_yaxes(range=[max(0, y_min - y_padding), y_max + y_padding])  # Explicit Y range
-
-            fig.update_layout(
-                title=f"Time Series: {patch_type} (position {coordinate})" if patch_type else "Time Series",
-                xaxis_title="Time",
-                yaxis_title="Number of Segmented Objects",
-                height=350,
-                hovermode="closest",
-                # Use coordinate-based uirevision to preserve zoom within same view
-                # but reset when coordinate changes
-                uirevision=f"{patch_type}_{coordinate}",
-            )
+            fig = {
+                "data": data,
+                "layout": {
+                    **TIMESERIES_LAYOUT,
+                    "title": {"text": f"Time Series: {patch_type} (position {coordinate})" if patch_type else "Time Series"},
+                    "xaxis": {**TIMESERIES_LAYOUT["xaxis"], "range": [x_min - x_padding, x_max + x_padding]},
+                    "yaxis": {**TIMESERIES_LAYOUT["yaxis"], "range": [max(0, y_min - y_padding), y_max + y_padding]},
+                    # Use coordinate-based uirevision to preserve zoom within same view
+                    # but reset when coordinate changes
+                    "uirevision": f"{patch_type}_{coordinate}",
+                },
+            }
 
             timeseries_data = {
-                'min_time': df['timestamp'].min().isoformat(),
-                'max_time': df['timestamp'].max().isoformat(),
+                'min_time': x_min.isoformat(),
+                'max_time': x_max.isoformat(),
                 'total_points': len(df),
             }
 
-            print(f"[TimeSeries] Plot built successfully with {len(df)} points", flush=True)
-            return fig, timeseries_data
+            logger.debug("[TimeSeries] Plot built successfully with %d points", len(df))
+            return fig, timeseries_data, stats
 
         except Exception as e:
-            print(f"[TimeSeries] ERROR building plot: {e}", flush=True)
-            import traceback
-            traceback.print_exc()
-            return go.Figure(), None
+            logger.exception("[TimeSeries] Error building plot: %s", e)
+            return EMPTY_FIGURE, None, no_update
 
     # =========================================================================
     # Data Table - Auto-updates
     # =========================================================================
     @app.callback(
         [
-            Output("data-table", "rowData"),
+            Output("table-view-store", "data"),
             Output("data-table", "columnDefs"),
             Output("table-row-count", "children"),
         ],
@@ -735,198 +642,215 @@ def register_callbacks(app, df_original, cache):
             Input("umap-plot", "clickData"),
             Input("reset-selection-btn", "n_clicks"),
             Input("data-store", "data"),
-            Input("ws", "message"),  # Direct WebSocket input for live updates
+            Input("ws-active-store", "data"),  # New images, only forwarded while not paused
         ],
         [
             State("patch-dropdown", "value"),
             State("coord-dropdown", "value"),
-            State("freeze-toggle", "checked"),
         ],
     )
-    def update_table(selected_data, click_data, _reset_clicks, stored_data, ws_message, _patch_type, coordinate, frozen):
-        """Update data table - auto-refreshes when new data arrives."""
-        triggered_id = ctx.triggered_id
-        print(f"[Table] *** CALLBACK TRIGGERED *** by: {triggered_id}", flush=True)
+    def update_table(selected_data, click_data, _reset_clicks, stored_data, ws_data, _patch_type, coordinate):
+        """
+        Update data table - auto-refreshes when new data arrives.
 
-        # Variable to store new filenames for highlighting
-        ws_new_filenames = []
+        Only a small descriptor of the rows to show goes to the browser; the
+        grid then fetches the rows it scrolls to from get_table_rows.
+        """
+        triggered_id = ctx.triggered_id
+        logger.debug("[Table] Triggered by: %s", triggered_id)
 
         try:
             # If triggered by WebSocket, reload fresh data (simple coord filter, no image check)
-            if triggered_id == "ws" and ws_message and coordinate:
-                # Check freeze state
-                if frozen:
-                    print("[Table] Frozen - skipping WebSocket update", flush=True)
-                    return no_update, no_update, no_update
-                # Parse WebSocket message directly
-                try:
-                    ws_data = json.loads(ws_message.get('data', '{}'))
-                    if ws_data.get('type') != 'new_image':
-                        print("[Table] Not a new_image message, skipping", flush=True)
-                        return no_update, no_update, no_update
-                    # Extract unique patch paths from WebSocket message (czi_filename is NOT unique)
-                    ws_new_filenames = [img.get('patch_path', '') for img in ws_data.get('images', [])]
-                    print(f"[Table] New patch paths from WS: {ws_new_filenames}", flush=True)
-                except (json.JSONDecodeError, AttributeError) as e:
-                    print(f"[Table] Failed to parse WebSocket message: {e}", flush=True)
-                    return no_update, no_update, no_update
-                print("[Table] WebSocket trigger - reloading fresh data", flush=True)
-                df_fresh = load_phenobase_data()
+            if triggered_id == "ws-active-store" and ws_data and coordinate:
+                # Extract unique patch paths from WebSocket message (czi_filename is NOT unique)
+                ws_new_filenames = [img.get('patch_path', '') for img in ws_data.get('images', [])]
+                logger.debug("[Table] New patch paths from WS: %s", ws_new_filenames)
+                logger.debug("[Table] WebSocket trigger - reloading fresh data")
                 coordinate_int = int(coordinate)
                 # Simple filter by coordinate only - don't check if images exist
-                filtered_df = df_fresh[df_fresh['pos'] == coordinate_int].copy()
-                print(f"[Table] Fresh data (coord={coordinate_int}): {len(filtered_df)} rows", flush=True)
-                if len(filtered_df) > 0:
-                    df = filtered_df
-                else:
-                    return [], [], "0 rows"
-            elif stored_data:
-                df = pd.DataFrame(stored_data)
+                position_rows = load_position_rows(coordinate_int)
+                n_rows = len(position_rows)
+                logger.debug("[Table] Fresh data (coord=%d): %d rows", coordinate_int, n_rows)
+                if n_rows == 0:
+                    return None, [], "0 rows"
+                # WebSocket trigger takes priority - always show latest data:
+                # all of the position's rows, newest first
+                id_limit = int(position_rows['id'].max()) + 1
+                view = {"coordinate": coordinate_int, "id_limit": id_limit, "new": ws_new_filenames}
             else:
-                return [], [], "0 rows"
+                df = load_umap_df(stored_data)
+                if df is None:
+                    return None, [], "0 rows"
+                if triggered_id == "reset-selection-btn":
+                    selection = None
+                elif selected_data and "points" in selected_data:
+                    selected_indices = selected_row_indices(df, selected_data["points"])
+                    selection = selected_indices.tolist() if len(selected_indices) else TABLE_HEAD_SELECTION
+                elif click_data and "points" in click_data:
+                    selection = selected_row_indices(df, click_data["points"][:1]).tolist()
+                else:
+                    # Default: show all data sorted by timestamp (newest first)
+                    selection = None
+                view = {"store_key": stored_data, "selection": selection}
+            try:
+                rows, n_total, new_rows_set = load_table_view(view)
+            except KeyError:
+                # The UMAP result behind the view expired from the cache
+                return None, [], "0 rows"
         except Exception as e:
-            print(f"[Table] ERROR loading data: {e}", flush=True)
-            return [], [], f"Error: {e}"
-
-        selected_indices = []
-
-        # WebSocket trigger takes priority - always show latest data
-        if triggered_id == "ws":
-            # WebSocket trigger: show ALL data sorted by timestamp (newest first)
-            # AG Grid will paginate, so we can show all rows
-            print(f"[Table] WebSocket trigger - showing ALL {len(df)} rows sorted by timestamp", flush=True)
-            selected_df = df.sort_values('timestamp', ascending=False) if 'timestamp' in df.columns else df
-        elif triggered_id == "reset-selection-btn":
-            selected_df = df.sort_values('timestamp', ascending=False) if 'timestamp' in df.columns else df
-        elif selected_data and "points" in selected_data:
-            selected_indices = [p["pointIndex"] for p in selected_data["points"]]
-            selected_df = df.iloc[selected_indices] if selected_indices else df.head(20)
-        elif click_data and "points" in click_data:
-            selected_indices = [click_data["points"][0]["pointIndex"]]
-            selected_df = df.iloc[selected_indices]
-        else:
-            # Default: show all data sorted by timestamp (newest first)
-            selected_df = df.sort_values('timestamp', ascending=False) if 'timestamp' in df.columns else df
-
-        column_defs = [
-            {"field": "czi_filename", "headerName": "Filename", "flex": 2},
-            {"field": "pos", "headerName": "Position", "flex": 1},
-            {"field": "date", "headerName": "Date", "flex": 1},
-            {"field": "time_period", "headerName": "Time", "flex": 1},
-            {"field": "timestamp", "headerName": "Timestamp", "flex": 1.5},
-            {"field": "object_count", "headerName": "Objects", "flex": 1},
-        ]
+            logger.exception("[Table] Error loading data: %s", e)
+            return None, [], f"Error: {e}"
 
-        # Add UMAP columns only if they exist
-        if "cluster" in selected_df.columns:
-            column_defs.append({"field": "cluster", "headerName": "Cluster", "flex": 1})
-        if "umap_x" in selected_df.columns:
-            column_defs.append({"field": "umap_x", "headerName": "UMAP X", "flex": 1, "valueFormatter": {"function": "d3.format('.2f')(params.value)"}})
-        if "umap_y" in selected_df.columns:
-            column_defs.append({"field": "umap_y", "headerName": "UMAP Y", "flex": 1, "valueFormatter": {"function": "d3.format('.2f')(params.value)"}})
-
-        # Build list of columns to include
-        table_columns = ["czi_filename", "pos", "date", "time_period"]
-        if "timestamp" in selected_df.columns:
-            table_columns.append("timestamp")
-        if "object_count" in selected_df.columns:
-            table_columns.append("object_count")
-        if "cluster" in selected_df.columns:
-            table_columns.append("cluster")
-        if "umap_x" in selected_df.columns:
-            table_columns.extend(["umap_x", "umap_y"])
-
-        available_cols = [c for c in table_columns if c in selected_df.columns]
-        table_data = selected_df[available_cols].to_dict("records")
-
-        # Mark new rows for highlighting and add unique row IDs
-        # Use patch path for matching (czi_filename is NOT unique per row)
-        new_rows_set = set(ws_new_filenames) if ws_new_filenames else set()
-        patch_col = 'patches_2d_ch0_tl_exp_path'
-
-        # Get patch paths from selected_df to match against (table_data may not have this column)
-        patch_paths = selected_df[patch_col].tolist() if patch_col in selected_df.columns else []
-
-        for i, row in enumerate(table_data):
-            row['_row_id'] = f"{row.get('czi_filename', '')}_{row.get('timestamp', i)}"
-            # Check if the corresponding patch path is in the new rows set
-            is_new = False
-            if i < len(patch_paths):
-                is_new = patch_paths[i] in new_rows_set
-            row['_is_new'] = is_new
-
-        row_count = f"{len(table_data)} of {len(df)} rows"
-        new_count = sum(1 for r in table_data if r.get('_is_new'))
-        print(f"[Table] Marking {new_count} rows as new out of {len(table_data)}", flush=True)
-        if new_count > 0:
-            row_count = f"{len(table_data)} of {len(df)} rows ({new_count} new)"
-        print(f"[Table] Returning {len(table_data)} rows to AG Grid ({new_count} new)", flush=True)
+        return view, table_column_defs(rows), table_row_count(rows, n_total, new_rows_set)
 
-        return table_data, column_defs, row_count
+    # The grid keeps the blocks it already fetched, so drop them whenever
+    # update_table points it at another view
+    app.clientside_callback(
+        """
+        function(view) {
+            try {
+                dash_ag_grid.getApi('data-table').purgeInfiniteCache();
+            } catch (e) {}  // Grid not initialized yet; its first request reads the view
+        }
+        """,
+        Input("table-view-store", "data"),
+        prevent_initial_call=True,
+    )
+
+    @app.callback(
+        Output("data-table", "getRowsResponse"),
+        Input("data-table", "getRowsRequest"),
+        State("table-view-store", "data"),
+        prevent_initial_call=True,
+    )
+    def get_table_rows(request, view):
+        """Answer the grid's request for one block of rows of the current view."""
+        if not request:
+            raise PreventUpdate
+        if not view:
+            return {"rowData": [], "rowCount": 0}
+        try:
+            rows, _, new_rows_set = load_table_view(
+                view, request.get("sortModel") or (), request.get("filterModel"),
+            )
+        except KeyError:
+            return {"rowData": [], "rowCount": 0}
+        block = rows.iloc[request.get("startRow", 0):request.get("endRow", len(rows))]
+        return {"rowData": build_table_rows(block, new_rows_set), "rowCount": len(rows)}
 
     # =========================================================================
     # Image Grid - Manual update with UMAP
     # =========================================================================
-    @app.callback(
+    # Every UMAP point carries its image path in the figure's customdata (see
+    # build_umap_figure), so the grid is built in the browser without a server
+    # round-trip per selection
+    app.clientside_callback(
+        """
+        function(selectedData, clickData, resetClicks, figure) {
+            const traces = (figure && figure.data) || [];
+            if (!traces.length) return 'No data available';
+
+            const triggered = window.dash_clientside.callback_context.triggered.map(t => t.prop_id);
+            let points = [];
+            if (!triggered.includes('reset-selection-btn.n_clicks')) {
+                if (selectedData && selectedData.points) {
+                    points = selectedData.points;
+                } else if (clickData && clickData.points) {
+                    points = clickData.points.slice(0, 1);
+                }
+            }
+
+            // customdata rows are [czi_filename, cluster, date, time_period, image path]
+            let paths = [];
+            for (const p of points) {
+                const customdata = traces[p.curveNumber || 0].customdata;
+                for (const i of (p.pointNumbers || [p.pointIndex])) paths.push(customdata[i][4]);
+            }
+            if (!paths.length) {
+                // No selection: the first 20 images, in trace order
+                for (const trace of traces) {
+                    for (const row of trace.customdata || []) {
+                        if (paths.length >= 20) break;
+                        paths.push(row[4]);
+                    }
+                }
+            }
+            paths = paths.filter(path => path);
+            if (!paths.length) return 'No images selected. Click or select points on the UMAP plot.';
+
+            return {
+                namespace: 'dash_mantine_components',
+                type: 'SimpleGrid',
+                props: {
+                    cols: 4,
+                    spacing: 'sm',
+                    verticalSpacing: 'sm',
+                    children: paths.map(path => ({
+                        namespace: 'dash_mantine_components',
+                        type: 'Card',
+                        props: {
+                            className: 'image-thumb-card',
+                            p: 'xs',
+                            withBorder: true,
+                            radius: 'md',
+                            children: [{
+                                namespace: 'dash_html_components',
+                                type: 'Div',
+                                props: {
+                                    id: {type: 'image-thumb', index: path},
+                                    style: {cursor: 'pointer'},
+                                    // dmc.Image forwards attributes that html.Img
+                                    // lacks, so off-screen thumbnails load lazily
+                                    // and decode off the main thread
+                                    children: {
+                                        namespace: 'dash_mantine_components',
+                                        type: 'Image',
+                                        props: {
+                                            src: '/images/' + path,
+                                            w: 150,
+                                            h: 150,
+                                            fit: 'cover',
+                                            radius: 4,
+                                            attributes: {root: {loading: 'lazy', decoding: 'async'}}
+                                        }
+                                    }
+                                }
+                            }]
+                        }
+                    }))
+                }
+            };
+        }
+        """,
         Output("image-grid", "children"),
-        [
-            Input("umap-plot", "selectedData"),
-            Input("umap-plot", "clickData"),
-            Input("reset-selection-btn", "n_clicks"),
-            Input("data-store", "data"),
-        ]
+        Input("umap-plot", "selectedData"),
+        Input("umap-plot", "clickData"),
+        Input("reset-selection-btn", "n_clicks"),
+        Input("umap-plot", "figure"),
     )
-    def update_image_grid(selected_data, click_data, reset_clicks, stored_data):
-        """Update image grid based on selection."""
-        if not stored_data:
-            return html.Div("No data available")
-
-        df = pd.DataFrame(stored_data)
-        selected_indices = []
-
-        triggered_id = ctx.triggered_id
-
-        if triggered_id == "reset-selection-btn":
-            selected_df = df.head(20)
-        else:
-            if selected_data and "points" in selected_data:
-                selected_indices = [p["pointIndex"] for p in selected_data["points"]]
-            elif click_data and "points" in click_data:
-                selected_indices = [click_data["points"][0]["pointIndex"]]
-
-            if selected_indices:
-                selected_df = df.iloc[selected_indices]
-            else:
-                selected_df = df.head(20)
-
-        return create_image_grid(selected_df)
 
     # =========================================================================
     # Image Modal
     # =========================================================================
-    @app.callback(
-        [
-            Output("image-modal", "opened"),
-            Output("modal-image", "src"),
-        ],
-        [Input({"type": "image-thumb", "index": ALL}, "n_clicks")],
-        [
-            State("image-modal", "opened"),
-        ],
+    # Opens from the clicked thumbnail's id alone, so it runs in the browser
+    app.clientside_callback(
+        """
+        function(nClicksList) {
+            // Thumbnails re-rendering with n_clicks=null is not a click
+            if (!nClicksList.some(Boolean)) return window.dash_clientside.no_update;
+
+            const triggered = window.dash_clientside.callback_context.triggered_id;
+            if (triggered && triggered.type === 'image-thumb') {
+                return [true, '/images/' + triggered.index];
+            }
+            return window.dash_clientside.no_update;
+        }
+        """,
+        Output("image-modal", "opened"),
+        Output("modal-image", "src"),
+        Input({"type": "image-thumb", "index": ALL}, "n_clicks"),
         prevent_initial_call=True,
     )
-    def toggle_modal(n_clicks_list, is_open):
-        """Toggle fullscreen image modal."""
-        if not any(n_clicks_list):
-            return False, ""
-
-        # Use ctx.triggered_id to get the exact image that was clicked
-        triggered_id = ctx.triggered_id
-        if triggered_id and isinstance(triggered_id, dict) and triggered_id.get("type") == "image-thumb":
-            image_path = triggered_id["index"]
-            return True, f"/images/{image_path}"
-
-        return False, ""
 
     # =========================================================================
     # Time Range Filter (existing functionality)
@@ -944,70 +868,48 @@ def register_callbacks(app, df_original, cache):
             State("coord-dropdown", "value"),
         ],
         prevent_initial_call=True,
+        # UMAP on a new range takes seconds; run it through the app's
+        # background callback manager instead of holding the event loop.
+        # Each job is a forked process: it starts from the server's
+        # in-memory caches (cached_umap_df, the embedding memo, the CSV
+        # state), but whatever it adds to them is lost when it exits. Only
+        # the flask-caching store is shared, so get_umap_figure keeps the
+        # result there, and a repeated range is served from it.
+        background=True,
+        running=[
+            (Output("update-umap-btn", "loading"), True, False),
+            (Output("loading-umap", "visible"), True, False),
+        ],
     )
     def filter_by_time_range(relayout_data, stored_data, patch_type, coordinate):
-        """Time range selection triggers UMAP recalculation."""
-        if not relayout_data or not stored_data:
+        """Time range selection triggers UMAP recalculation (as a background callback)."""
+        df = load_umap_df(stored_data) if relayout_data else None
+        if df is None:
             raise PreventUpdate
 
-        df = pd.DataFrame(stored_data)
-
         if 'xaxis.range[0]' in relayout_data and 'xaxis.range[1]' in relayout_data:
             start_time = pd.to_datetime(relayout_data['xaxis.range[0]'])
             end_time = pd.to_datetime(relayout_data['xaxis.range[1]'])
 
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            # timestamp is datetime64 from load_phenobase_data on, so compare
+            # the raw values; df is shared through load_umap_df and not modified
+            timestamps = df['timestamp'].to_numpy()
             time_filtered_df = df[
-                (df['timestamp'] >= start_time) &
-                (df['timestamp'] <= end_time)
-            ].copy()
+                (timestamps >= start_time.to_datetime64()) &
+                (timestamps <= end_time.to_datetime64())
+            ]
 
             if len(time_filtered_df) == 0:
-                empty_fig = go.Figure()
-                empty_fig.update_layout(title="No data in selected time range")
-                return empty_fig, stored_data, "No data in range"
-
-            cache_key = f"umap_{patch_type}_{coordinate}_{start_time.isoformat()}_{end_time.isoformat()}"
-
-            @cache.memoize(timeout=3600)
-            def get_cached_umap(key, df_subset):
-                features, clusters = generate_random_features(df_subset)
-                embedding = compute_umap_embedding(features)
-                return embedding, clusters
-
-            embedding, clusters = get_cached_umap(cache_key, time_filtered_df)
-            umap_df = create_umap_dataframe(time_filtered_df, embedding, clusters)
-
-            fig = px.scatter(
-                umap_df,
-                x="umap_x",
-                y="umap_y",
-                color="cluster",
-                hover_data=["czi_filename", "pos", "date", "time_period"],
-                title=f"UMAP: {patch_type} (position {coordinate}) - Time Filtered",
-                color_discrete_sequence=px.colors.qualitative.Plotly,
-                custom_data=["czi_filename", "cluster", "date", "time_period"],
-            )
+                return NO_DATA_IN_RANGE_FIGURE, stored_data, "No data in range"
 
-            fig.update_traces(
-                marker=dict(size=10, opacity=0.7, line=dict(width=1, color='white')),
-                hovertemplate=(
-                    "<b>%{customdata[0]}</b><br>"
-                    "Cluster: %{customdata[1]}<br>"
-                    "Date: %{customdata[2]}<br>"
-                    "Time: %{customdata[3]}<br>"
-                    "UMAP X: %{x:.2f}<br>"
-                    "UMAP Y: %{y:.2f}<br>"
-                    "<extra></extra>"
-                ),
+            cache_key = (
+                f"umap_{patch_type}_{coordinate}_{start_time.isoformat()}_{end_time.isoformat()}"
+                f"_{len(time_filtered_df)}"
             )
-
-            fig.update_layout(
-                clickmode="event+select",
-                dragmode="lasso",
-                hovermode="closest",
-                height=500,
-                margin=dict(l=20, r=20, t=40, b=20),
+            fig = get_umap_figure(
+                cache_key,
+                f"UMAP: {patch_type} (position {coordinate}) - Time Filtered",
+                lambda: time_filtered_df,
             )
 
             duration_minutes = (end_time - start_time).total_seconds() / 60
@@ -1016,105 +918,822 @@ def register_callbacks(app, df_original, cache):
             else:
                 badge_text = f"{len(time_filtered_df)} images ({duration_minutes/60:.1f}h)"
 
-            return fig, umap_df.to_dict("records"), badge_text
+            return fig, cache_key, badge_text
 
         elif 'xaxis.autorange' in relayout_data:
             # User clicked "All" or double-clicked to reset - reload full data
-            print("[TimeFilter] Resetting to full data view", flush=True)
+            logger.debug("[TimeFilter] Resetting to full data view")
 
-            # Reload fresh data from source
-            df_full = load_phenobase_data()
-
-            # Filter by coordinate like the main callback does
-            coordinate_int = int(coordinate) if coordinate else None
-            if coordinate_int is not None:
-                filtered_df = df_full[df_full['pos'] == coordinate_int].copy()
-            else:
-                filtered_df = df_full.copy()
-
-            # Keep only rows with valid images
-            if 'image_path' in filtered_df.columns:
-                filtered_df = filtered_df[
-                    filtered_df['image_path'].apply(lambda p: Path(p).exists() if pd.notna(p) else False)
-                ].copy()
+            # Reload fresh data from source, filtered like the main callback
+            # does; get_image_dataframe already drops rows whose image is not
+            # in its (cached) directory listing
+            coordinate_int = int(coordinate) if coordinate is not None else None
+            filtered_df = get_image_dataframe(load_phenobase_data(), patch_type, coordinate_int)
 
             if len(filtered_df) == 0:
                 return no_update, stored_data, "No data"
 
             # Recompute UMAP with full data
-            cache_key = f"umap_{patch_type}_{coordinate}_full_reset"
-
-            @cache.memoize(timeout=3600)
-            def get_cached_umap_reset(key, df_subset):
-                features, clusters = generate_random_features(df_subset)
-                embedding = compute_umap_embedding(features)
-                return embedding, clusters
-
-            embedding, clusters = get_cached_umap_reset(cache_key, filtered_df)
-            umap_df = create_umap_dataframe(filtered_df, embedding, clusters)
-
-            fig = px.scatter(
-                umap_df,
-                x="umap_x",
-                y="umap_y",
-                color="cluster",
-                hover_data=["czi_filename", "pos", "date", "time_period"],
-                title=f"UMAP: {patch_type} (position {coordinate})",
-                color_discrete_sequence=px.colors.qualitative.Plotly,
-                custom_data=["czi_filename", "cluster", "date", "time_period"],
+            cache_key = f"umap_{patch_type}_{coordinate}_full_reset_{len(filtered_df)}"
+            fig = get_umap_figure(
+                cache_key, f"UMAP: {patch_type} (position {coordinate})", lambda: filtered_df
             )
 
-            fig.update_traces(
-                marker=dict(size=10, opacity=0.7, line=dict(width=1, color='white')),
-            )
+            return fig, cache_key, f"{len(filtered_df)} images (all data)"
 
-            fig.update_layout(
-                clickmode="event+select",
-                dragmode="lasso",
-                hovermode="closest",
-                height=500,
-                margin=dict(l=20, r=20, t=40, b=20),
-            )
+        raise PreventUpdate
 
-            return fig, umap_df.to_dict("records"), f"{len(filtered_df)} images (all data)"
 
-        raise PreventUpdate
+# Image paths in the UMAP data are absolute; thumbnails are served relative to this
+DATA_ROOT = Path("data").absolute()
+DATA_ROOT_PREFIX = str(DATA_ROOT) + os.sep
+
+# Styling that go.Figure would attach to every figure, resolved once for the
+# plain-dict figures built below
+FIGURE_TEMPLATE = pio.templates[pio.templates.default].to_plotly_json()
+
+# Everything in the time series layout that does not depend on the data
+TIMESERIES_LAYOUT = {
+    "template": FIGURE_TEMPLATE,
+    "xaxis": {
+        # Set explicitly: x is sent as epoch milliseconds (see epoch_ms_array),
+        # which Plotly would otherwise autotype as a linear axis
+        "type": "date",
+        "title": {"text": "Time"},
+        "rangeslider": {"visible": True, "bgcolor": "#f8f9fa", "thickness": 0.05},
+        "rangeselector": {
+            "buttons": [
+                {"count": 1, "label": "1m", "step": "minute", "stepmode": "backward"},
+                {"count": 5, "label": "5m", "step": "minute", "stepmode": "backward"},
+                {"count": 10, "label": "10m", "step": "minute", "stepmode": "backward"},
+                {"count": 30, "label": "30m", "step": "minute", "stepmode": "backward"},
+                {"count": 60, "label": "60m", "step": "minute", "stepmode": "backward"},
+                {"step": "all", "label": "All"},
+            ],
+            "bgcolor": "#f1f3f5",
+            "activecolor": "#1971c2",
+        },
+    },
+    "yaxis": {"title": {"text": "Number of Segmented Objects"}},
+    "height": 350,
+    "hovermode": "closest",
+}
+TIMESERIES_CUSTOMDATA_COLUMNS = ["czi_filename", "id"]
+TIMESERIES_HOVERTEMPLATE = (
+    "<b>%{customdata[0]}</b><br>"
+    "Time: %{x}<br>"
+    "Objects: %{y}<br>"
+    "<extra></extra>"
+)
+TIMESERIES_NEW_HOVERTEMPLATE = TIMESERIES_HOVERTEMPLATE.replace("</b>", "</b> (new)", 1)
+TIMESERIES_BINNED_HOVERTEMPLATE = (
+    "Time: %{x}<br>"
+    "Objects (mean): %{y:.1f}<br>"
+    "%{customdata} images<br>"
+    "<extra></extra>"
+)
+
+# Above this many points the time series is drawn with WebGL
+TIMESERIES_WEBGL_MIN_POINTS = 1_000
+# Above this many points older images are averaged into time bins
+TIMESERIES_MAX_POINTS = 50_000
+
+# Placeholder figures, built once and returned as-is
+def _empty_umap_figure(title: str) -> dict:
+    return {
+        "data": [],
+        "layout": {
+            "template": FIGURE_TEMPLATE,
+            "title": {"text": title},
+            "xaxis": {"title": {"text": "UMAP 1"}},
+            "yaxis": {"title": {"text": "UMAP 2"}},
+        },
+    }
+
+
+EMPTY_FIGURE = {"data": [], "layout": {"template": FIGURE_TEMPLATE}}
+NO_DATA_FIGURE = _empty_umap_figure("No data available")
+NO_DATA_IN_RANGE_FIGURE = {"data": [], "layout": {"template": FIGURE_TEMPLATE, "title": {"text": "No data in selected time range"}}}
+
+# AG Grid column definitions, with and without the UMAP result columns
+TABLE_COLUMN_DEFS = [
+    {"field": "czi_filename", "headerName": "Filename", "flex": 2},
+    {"field": "pos", "headerName": "Position", "flex": 1},
+    {"field": "date", "headerName": "Date", "flex": 1},
+    {"field": "time_period", "headerName": "Time", "flex": 1},
+    {"field": "timestamp", "headerName": "Timestamp", "flex": 1.5},
+    {"field": "object_count", "headerName": "Objects", "flex": 1},
+]
+UMAP_TABLE_COLUMN_DEFS = TABLE_COLUMN_DEFS + [
+    {"field": "cluster", "headerName": "Cluster", "flex": 1},
+    {"field": "umap_x", "headerName": "UMAP X", "flex": 1, "valueFormatter": {"function": "d3.format('.2f')(params.value)"}},
+    {"field": "umap_y", "headerName": "UMAP Y", "flex": 1, "valueFormatter": {"function": "d3.format('.2f')(params.value)"}},
+]
+
+# Fields of the full table, in column order
+TABLE_COLUMNS = [col["field"] for col in UMAP_TABLE_COLUMN_DEFS]
+
+# Table view selection for the first rows, shown when a selection maps to none
+TABLE_HEAD_SELECTION = "head"
+
+# Columns update_table reads from the UMAP data
+TABLE_SOURCE_COLUMNS = [
+    "id", "czi_filename", "pos", "date", "time_period", "timestamp", "object_count",
+    "cluster", "umap_x", "umap_y", "patches_2d_ch0_tl_exp_path",
+]
+
+UMAP_CUSTOMDATA_COLUMNS = ["czi_filename", "cluster", "date", "time_period"]
+UMAP_HOVERTEMPLATE = (
+    "<b>%{customdata[0]}</b><br>"
+    "Cluster: %{customdata[1]}<br>"
+    "Date: %{customdata[2]}<br>"
+    "Time: %{customdata[3]}<br>"
+    "UMAP X: %{x:.2f}<br>"
+    "UMAP Y: %{y:.2f}<br>"
+    "<extra></extra>"
+)
+
+
+CLUSTER_PALETTE = tuple(qualitative.Plotly)
+
+# Above this many clusters the UMAP is drawn as a single trace
+MAX_CLUSTER_TRACES = 20
+
+
+@lru_cache(maxsize=None)
+def cluster_color(cluster: str, position: int) -> str:
+    """
+    Palette color for a cluster label.
+
+    Numeric labels pick by value, so a cluster keeps its color in subsets
+    (e.g. time-filtered UMAPs) where other clusters are missing; other labels
+    fall back to the trace position.
+    """
+    index = int(cluster) if cluster.isdigit() else position
+    return CLUSTER_PALETTE[index % len(CLUSTER_PALETTE)]
+
+
+def typed_array(values: np.ndarray) -> dict:
+    """
+    Encode numbers as a Plotly typed array (base64 float32).
+
+    Sent as raw bytes instead of a JSON list of decimal strings, which keeps
+    large scatter payloads small and fast to parse in the browser.
+    """
+    data = np.ascontiguousarray(values, dtype=np.float32)
+    return {"dtype": "f4", "bdata": base64.b64encode(data.tobytes()).decode("ascii")}
+
+
+def epoch_ms_array(timestamps: np.ndarray) -> dict:
+    """
+    Encode naive timestamps as a Plotly typed array of epoch milliseconds.
+
+    A date axis reads these the same as ISO strings, at 8 bytes per point
+    instead of a ~28 character string each.
+    """
+    ms = timestamps.astype("datetime64[ms]").view(np.int64).astype(np.float64)
+    return {"dtype": "f8", "bdata": base64.b64encode(ms.tobytes()).decode("ascii")}
+
+
+def build_umap_figure(umap_df: pd.DataFrame, title: str) -> tuple[dict, pd.DataFrame]:
+    """
+    Build the UMAP scatter as one WebGL trace per cluster.
+
+    Past MAX_CLUSTER_TRACES clusters a single trace with per-point colors is
+    used instead, as plotly.js cost grows with the number of traces.
+
+    The figure is a plain dict, which Dash serializes directly without
+    go.Figure's validation and copying.
+
+    Rows are sorted by cluster so that each trace covers a contiguous block of
+    the returned frame; selected_row_indices relies on this to map plot points
+    back to rows.
+
+    Args:
+        umap_df: DataFrame with umap_x, umap_y, cluster and metadata columns
+        title: Figure title
+
+    Returns:
+        Tuple of (figure dict, umap_df reordered to match the traces)
+    """
+    umap_df = umap_df.sort_values("cluster", kind="stable").reset_index(drop=True)
+
+    groups = list(umap_df.groupby("cluster", sort=False))
+    # Converted once for the whole frame; each trace takes a slice of it.
+    # The last column is the image path the browser's image grid shows
+    if "image_path" in umap_df.columns:
+        image_paths = umap_df["image_path"].map(image_url_path, na_action="ignore")
+    else:
+        image_paths = pd.Series(None, index=umap_df.index, dtype=object)
+    customdata = np.column_stack([
+        umap_df[UMAP_CUSTOMDATA_COLUMNS].to_numpy(),
+        image_paths.to_numpy(dtype=object, na_value=None),
+    ])
+    marker_style = {"size": 10, "opacity": 0.7, "line": {"width": 1, "color": "white"}}
+
+    if len(groups) > MAX_CLUSTER_TRACES:
+        # Too many clusters for a trace (and WebGL program) each: draw every
+        # point in one trace, colored through a stepped colorscale with one
+        # band per cluster
+        colors = [cluster_color(str(cluster), i) for i, (cluster, _) in enumerate(groups)]
+        codes = np.repeat(np.arange(len(groups)), [len(g) for _, g in groups])
+        colorscale = []
+        for i, color in enumerate(colors):
+            colorscale += [[i / len(colors), color], [(i + 1) / len(colors), color]]
+        umap_df.attrs["trace_starts"] = [0]
+        data = [{
+            "type": "scattergl",
+            "mode": "markers",
+            "showlegend": False,
+            "x": typed_array(umap_df["umap_x"].to_numpy()),
+            "y": typed_array(umap_df["umap_y"].to_numpy()),
+            "customdata": customdata,
+            "hovertemplate": UMAP_HOVERTEMPLATE,
+            "marker": {
+                **marker_style,
+                "color": typed_array(codes),
+                "colorscale": colorscale,
+                "cmin": -0.5,
+                "cmax": len(colors) - 0.5,
+            },
+        }]
+    else:
+        # First row of each trace; kept on the frame (and pickled with it into the
+        # cache) so selections map to rows without rescanning the cluster column
+        umap_df.attrs["trace_starts"] = np.cumsum([0] + [len(g) for _, g in groups[:-1]]).tolist()
+        data = []
+        for i, ((cluster, group), start) in enumerate(zip(groups, umap_df.attrs["trace_starts"])):
+            data.append({
+                "type": "scattergl",
+                "mode": "markers",
+                "name": str(cluster),
+                "legendgroup": str(cluster),
+                "x": typed_array(group["umap_x"].to_numpy()),
+                "y": typed_array(group["umap_y"].to_numpy()),
+                "customdata": customdata[start:start + len(group)],
+                "hovertemplate": UMAP_HOVERTEMPLATE,
+                "marker": {**marker_style, "color": cluster_color(str(cluster), i)},
+            })
+
+    layout = {
+        "template": FIGURE_TEMPLATE,
+        "title": {"text": title},
+        "legend": {"title": {"text": "cluster"}},
+        "xaxis": {"title": {"text": "umap_x"}},
+        "yaxis": {"title": {"text": "umap_y"}},
+        "clickmode": "event+select",
+        "dragmode": "lasso",
+        # Zoom, pan and legend toggles survive a redraw with the same title
+        # (an Update UMAP for the same filters); changing filters resets them
+        "uirevision": title,
+        "hovermode": "closest",
+        "height": 500,
+        "margin": {"l": 20, "r": 20, "t": 40, "b": 20},
+    }
+
+    return {"data": data, "layout": layout}, umap_df
+
+
+def selected_row_indices(df: pd.DataFrame, points: list) -> np.ndarray:
+    """
+    Map selected UMAP points to row positions in the stored UMAP data.
+
+    Plotly reports pointIndex relative to each trace, so it is offset by the
+    first row of the point's cluster block (see build_umap_figure). Both are
+    gathered into arrays so the mapping is a single vectorized add. Points
+    that carry a pointNumbers list contribute all of its indices.
+
+    Args:
+        df: UMAP DataFrame as returned by build_umap_figure
+        points: Points from the figure's selectedData or clickData
+
+    Returns:
+        Array of row positions for df.iloc
+    """
+    if points and any("pointNumbers" in p for p in points):
+        # Aggregated points carry all their trace-relative indices at once
+        point_index = np.concatenate([
+            np.asarray(p["pointNumbers"] if "pointNumbers" in p else [p["pointIndex"]], dtype=np.intp)
+            for p in points
+        ])
+        curve_number = np.repeat(
+            np.fromiter((p.get("curveNumber", 0) for p in points), dtype=np.intp, count=len(points)),
+            [len(p.get("pointNumbers", (None,))) for p in points],
+        )
+    else:
+        point_index = np.fromiter((p["pointIndex"] for p in points), dtype=np.intp, count=len(points))
+        curve_number = None
+    if "trace_starts" in df.attrs:
+        trace_starts = np.asarray(df.attrs["trace_starts"], dtype=np.intp)
+    elif "cluster" in df.columns:
+        clusters = df["cluster"].to_numpy()
+        trace_starts = np.flatnonzero(np.r_[True, clusters[1:] != clusters[:-1]])
+    else:
+        return point_index
+    if curve_number is None:
+        curve_number = np.fromiter((p.get("curveNumber", 0) for p in points), dtype=np.intp, count=len(points))
+    return trace_starts[curve_number] + point_index
+
+
+def bin_time_series(df: pd.DataFrame, n_bins: int) -> pd.DataFrame:
+    """
+    Average object counts over equal-width time bins.
+
+    Args:
+        df: Rows with timestamp and object_count, in timestamp order
+        n_bins: Maximum number of bins
+
+    Returns:
+        DataFrame with one row per non-empty bin: timestamp (first in the
+        bin), mean object_count and n_images
+    """
+    timestamps = df['timestamp'].to_numpy()
+    ticks = timestamps.view(np.int64)
+    width = max(1, -(-(int(ticks[-1]) - int(ticks[0]) + 1) // n_bins))
+    bins = pd.DataFrame({
+        'bin': (ticks - ticks[0]) // width,
+        'timestamp': timestamps,
+        'object_count': df['object_count'].to_numpy(),
+    })
+    return bins.groupby('bin', sort=False).agg(
+        timestamp=('timestamp', 'first'),
+        object_count=('object_count', 'mean'),
+        n_images=('object_count', 'size'),
+    )
+
+
+def new_row_mask(paths: pd.Series, new_paths: set) -> np.ndarray:
+    """
+    Flag the rows whose patch path is one of new_paths.
+
+    Categorical columns (see load_phenobase_data) are matched on their integer
+    codes, so the per-row comparison never touches the path strings.
+
+    Args:
+        paths: Patch path column
+        new_paths: Patch paths announced as new
+
+    Returns:
+        Boolean array aligned with paths
+    """
+    if isinstance(paths.dtype, pd.CategoricalDtype):
+        new_codes = paths.cat.categories.get_indexer(list(new_paths))
+        return np.isin(paths.cat.codes.to_numpy(), new_codes[new_codes >= 0])
+    return paths.isin(new_paths).to_numpy()
+
+
+def table_column_defs(df: pd.DataFrame) -> list:
+    """AG Grid column definitions for df, with the UMAP columns only if it has them."""
+    return UMAP_TABLE_COLUMN_DEFS if "umap_x" in df.columns else TABLE_COLUMN_DEFS
+
+
+def table_row_count(df: pd.DataFrame, n_total: int, new_rows_set: frozenset) -> str:
+    """Row-count text for a table view of df, selected from n_total rows."""
+    row_count = f"{len(df)} of {n_total} rows"
+    if new_rows_set and ROW_KEY_COLUMN in df.columns:
+        new_count = int(new_row_mask(df[ROW_KEY_COLUMN], new_rows_set).sum())
+        if new_count > 0:
+            row_count = f"{len(df)} of {n_total} rows ({new_count} new)"
+    return row_count
+
+
+def build_table_rows(selected_df: pd.DataFrame, new_rows_set: frozenset) -> list:
+    """
+    Build the AG Grid row dicts for selected_df.
+
+    Args:
+        selected_df: Rows to send, in display order
+        new_rows_set: Patch paths to highlight as new
+
+    Returns:
+        List of row dicts
+    """
+    available_cols = [c for c in TABLE_COLUMNS if c in selected_df.columns]
+
+    # Mark new rows for highlighting; use patch path for matching
+    # (czi_filename is NOT unique per row)
+    if ROW_KEY_COLUMN in selected_df.columns:
+        is_new_rows = new_row_mask(selected_df[ROW_KEY_COLUMN], new_rows_set).tolist()
+    else:
+        is_new_rows = [False] * len(selected_df)
+
+    # Build the row dicts from whole columns: one list per column is much
+    # cheaper than DataFrame.to_dict("records") walking row by row
+    columns = [table_column_values(selected_df[c]) for c in available_cols]
+    table_data = [
+        {**dict(zip(available_cols, values)), '_row_id': row_id, '_is_new': is_new}
+        for values, row_id, is_new in zip(zip(*columns), table_row_ids(selected_df), is_new_rows)
+    ]
+    logger.debug("[Table] Returning %d rows to AG Grid", len(table_data))
+    return table_data
+
+
+def sort_table_rows(df: pd.DataFrame, sort_model: list) -> pd.DataFrame:
+    """Sort df by an AG Grid sortModel ([{"colId": ..., "sort": "asc"|"desc"}, ...])."""
+    sort_model = [s for s in sort_model if s.get("colId") in df.columns]
+    if not sort_model:
+        return df
+    return df.sort_values(
+        [s["colId"] for s in sort_model],
+        ascending=[s.get("sort") != "desc" for s in sort_model],
+        kind="stable",
+    )
+
+
+def filter_table_rows(df: pd.DataFrame, filter_model: dict) -> pd.DataFrame:
+    """
+    Keep the rows of df that pass an AG Grid filterModel.
+
+    The grid's default text filter is applied to each column's displayed
+    text, including its two-condition form joined by AND or OR.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for col, model in (filter_model or {}).items():
+        if col not in df.columns:
+            continue
+        text = pd.Series(table_column_values(df[col]), index=df.index, dtype=object)
+        text = text.where(text.isna(), text.astype(str).str.lower())
+        conditions = model.get("conditions") or [model]
+        col_masks = [text_filter_mask(text, cond) for cond in conditions]
+        if model.get("operator") == "OR":
+            mask &= np.logical_or.reduce(col_masks)
+        else:
+            mask &= np.logical_and.reduce(col_masks)
+    return df if mask.all() else df[mask]
+
+
+def text_filter_mask(text: pd.Series, condition: dict) -> np.ndarray:
+    """Rows of lower-cased text matching one AG Grid text filter condition."""
+    kind = condition.get("type", "contains")
+    blank = text.isna() | (text == "")
+    if kind == "blank":
+        return blank.to_numpy()
+    if kind == "notBlank":
+        return ~blank.to_numpy()
+    value = str(condition.get("filter") or "").lower()
+    text = text.fillna("")
+    if kind == "equals":
+        matched = text == value
+    elif kind == "notEqual":
+        matched = text != value
+    elif kind == "startsWith":
+        matched = text.str.startswith(value)
+    elif kind == "endsWith":
+        matched = text.str.endswith(value)
+    elif kind == "notContains":
+        matched = ~text.str.contains(value, regex=False)
+    else:
+        matched = text.str.contains(value, regex=False)
+    return matched.to_numpy(dtype=bool)
+
+
+def table_column_values(column: pd.Series) -> list:
+    """
+    List a column's values for the AG Grid payload.
+
+    Datetimes are formatted as ISO strings in one vectorized pass, matching
+    what the JSON encoder would write for each Timestamp (they are whole
+    seconds), instead of boxing and encoding every value separately.
+    """
+    if pd.api.types.is_datetime64_any_dtype(column):
+        values = np.datetime_as_string(column.to_numpy(), unit='s').astype(object)
+        values[column.isna().to_numpy()] = None
+        return values.tolist()
+    return column.tolist()
+
+
+def table_row_ids(df: pd.DataFrame) -> list:
+    """
+    Build the AG Grid row IDs for every row of df from its CSV row id.
+
+    The id is assigned once, when the row is parsed, and appended rows get
+    new ones. Timestamps would not do: generate_time_series_metadata
+    reassigns them over all rows whenever the CSV changes.
+    """
+    if 'id' in df.columns:
+        return df['id'].astype(str).tolist()
+    return [str(i) for i in range(len(df))]
+
+
+def image_url_path(image_path: str) -> str:
+    """Path of an absolute image file relative to DATA_ROOT, as used in /images/ URLs."""
+    # Image paths are built by joining onto DATA_ROOT, so a string prefix
+    # check covers them without constructing Path objects
+    if image_path.startswith(DATA_ROOT_PREFIX):
+        return image_path[len(DATA_ROOT_PREFIX):]
+    return str(Path(image_path).relative_to(DATA_ROOT))
 
 
-def create_image_grid(df: pd.DataFrame) -> html.Div:
-    """Create a grid of image thumbnails."""
-    if len(df) == 0:
-        return html.Div("No images selected. Click or select points on the UMAP plot.")
+@lru_cache(maxsize=256)
+def create_live_stats(n_images: int, n_dates: int, time_periods: tuple) -> dmc.Stack:
+    """
+    Create the statistics panel shown while new images stream in.
 
-    images = []
-    for idx, row in df.iterrows():
-        if "image_path" in row and pd.notna(row["image_path"]):
-            rel_path = Path(row["image_path"]).relative_to(Path("data").absolute())
+    Args:
+        n_images: Number of images at the current position
+        n_dates: Number of unique dates
+        time_periods: Unique time periods (hashable for the cache)
 
-            image_card = dmc.Card(
+    Returns:
+        Stack of stat rows
+    """
+    return dmc.Stack(
+        gap="sm",
+        children=[
+            dmc.Group(
+                gap="xs",
                 children=[
-                    html.Img(
-                        id={"type": "image-thumb", "index": str(rel_path)},
-                        src=f"/images/{rel_path}",
-                        style={
-                            "width": "150px",
-                            "height": "150px",
-                            "objectFit": "cover",
-                            "cursor": "pointer",
-                            "borderRadius": "4px",
-                        },
+                    dmc.ThemeIcon(size="lg", radius="md", variant="light", color="blue", children="📊"),
+                    dmc.Stack(
+                        gap=0,
+                        children=[
+                            dmc.Text(str(n_images), fw=700, size="xl", c="blue"),
+                            dmc.Text("Total Images", size="xs", c="dimmed"),
+                        ]
                     ),
-                ],
-                p="xs",
-                withBorder=True,
-                radius="md",
-            )
+                ]
+            ),
+            dmc.Divider(),
+            dmc.Group(
+                gap="xs",
+                children=[
+                    dmc.ThemeIcon(size="lg", radius="md", variant="light", color="orange", children="🔄"),
+                    dmc.Stack(
+                        gap=0,
+                        children=[
+                            dmc.Text("LIVE", fw=700, size="xl", c="orange"),
+                            dmc.Text("Refresh UMAP for clusters", size="xs", c="dimmed"),
+                        ]
+                    ),
+                ]
+            ),
+            dmc.Divider(),
+            dmc.Group(
+                gap="xs",
+                children=[
+                    dmc.ThemeIcon(size="lg", radius="md", variant="light", color="teal", children="📅"),
+                    dmc.Stack(
+                        gap=0,
+                        children=[
+                            dmc.Text(str(n_dates), fw=700, size="xl", c="teal"),
+                            dmc.Text("Unique Dates", size="xs", c="dimmed"),
+                        ]
+                    ),
+                ]
+            ),
+            dmc.Divider(),
+            dmc.Stack(
+                gap="xs",
+                children=[
+                    dmc.Text("Time Periods:", fw=500, size="sm"),
+                    dmc.Group(
+                        gap="xs",
+                        children=[
+                            dmc.Badge(tp, size="sm", variant="light") for tp in time_periods
+                        ]
+                    ),
+                ]
+            ) if time_periods else None,
+        ]
+    )
+
+
+@lru_cache(maxsize=256)
+def create_umap_stats(n_images: int, n_clusters: int, n_dates: int, time_periods: tuple) -> dmc.Stack:
+    """
+    Create the statistics panel for a UMAP result.
 
-            images.append(image_card)
+    Cached on its arguments, which fully determine the tree, so revisiting a
+    result reuses the components instead of rebuilding them.
 
-    return dmc.SimpleGrid(
-        cols=4,
-        spacing="sm",
-        verticalSpacing="sm",
-        children=images,
+    Args:
+        n_images: Number of images in the UMAP
+        n_clusters: Number of clusters
+        n_dates: Number of unique acquisition dates
+        time_periods: Time periods present, excluding 'N/A'
+
+    Returns:
+        Stack of stat rows
+    """
+    return dmc.Stack(
+        gap="sm",
+        children=[
+            dmc.Group(
+                gap="xs",
+                children=[
+                    dmc.ThemeIcon(size="lg", radius="md", variant="light", color="blue", children="📊"),
+                    dmc.Stack(
+                        gap=0,
+                        children=[
+                            dmc.Text(str(n_images), fw=700, size="xl", c="blue"),
+                            dmc.Text("Total Images", size="xs", c="dimmed"),
+                        ]
+                    ),
+                ]
+            ),
+            dmc.Divider(),
+            dmc.Group(
+                gap="xs",
+                children=[
+                    dmc.ThemeIcon(size="lg", radius="md", variant="light", color="grape", children="🎨"),
+                    dmc.Stack(
+                        gap=0,
+                        children=[
+                            dmc.Text(str(n_clusters), fw=700, size="xl", c="grape"),
+                            dmc.Text("Clusters", size="xs", c="dimmed"),
+                        ]
+                    ),
+                ]
+            ),
+            dmc.Divider(),
+            dmc.Group(
+                gap="xs",
+                children=[
+                    dmc.ThemeIcon(size="lg", radius="md", variant="light", color="teal", children="📅"),
+                    dmc.Stack(
+                        gap=0,
+                        children=[
+                            dmc.Text(str(n_dates), fw=700, size="xl", c="teal"),
+                            dmc.Text("Unique Dates", size="xs", c="dimmed"),
+                        ]
+                    ),
+                ]
+            ),
+            dmc.Divider(),
+            dmc.Stack(
+                gap="xs",
+                children=[
+                    dmc.Text("Time Periods:", fw=500, size="sm"),
+                    dmc.Group(
+                        gap="xs",
+                        children=[
+                            dmc.Badge(tp, size="sm", variant="light") for tp in time_periods
+                        ]
+                    ),
+                ]
+            ) if len(time_periods) > 0 else None,
+        ]
+    )
+
+
+# Events kept in event-log-store and rendered in the log; older ones are
+# dropped, so the store and the card list stay bounded on long sessions
+MAX_EVENTS = 15
+
+# Props that differ between a highlighted (new) event card and a seen one
+EVENT_CARD_HIGHLIGHT = {
+    True: {
+        "icon": {"color": "green", "variant": "filled"},
+        "label": {"fw": 600, "c": "green"},
+        "card": {
+            "className": "new-event",
+            "style": {
+                "backgroundColor": "var(--mantine-color-green-1)",
+                "borderColor": "var(--mantine-color-green-5)",
+                "borderWidth": "2px",
+                "transition": "all 0.3s ease",
+            },
+        },
+    },
+    False: {
+        "icon": {"color": "gray", "variant": "light"},
+        "label": {"fw": 400, "c": "dark"},
+        "card": {
+            "className": "",
+            "style": {
+                "backgroundColor": "transparent",
+                "borderColor": "var(--mantine-color-gray-3)",
+                "borderWidth": "1px",
+                "transition": "all 0.3s ease",
+            },
+        },
+    },
+}
+
+
+@lru_cache(maxsize=2048)
+def event_image_row(pos, filename: str) -> dmc.Group:
+    """
+    Create the position/filename row shown under an event.
+
+    The same images reappear in the log on every update until they scroll out,
+    so rows are built once and shared.
+
+    Args:
+        pos: Coordinate position (or '?' if unknown)
+        filename: Image filename
+
+    Returns:
+        Group with a position badge and the truncated filename
+    """
+    return dmc.Group(
+        gap=4,
+        children=[
+            dmc.Badge(
+                f"pos {pos}",
+                size="xs",
+                variant="dot",
+                color="blue",
+            ),
+            dmc.Text(
+                filename[:25] + ('...' if len(filename) > 25 else ''),
+                size="xs",
+                c="dimmed",
+                style={"fontFamily": "monospace"},
+            ),
+        ]
     )
+
+
+def create_event_card(evt: dict) -> dmc.Paper:
+    """
+    Create the event log card for one WebSocket event.
+
+    Args:
+        evt: Event dict with count, total, timestamp, images and is_new
+
+    Returns:
+        Paper component, highlighted when the event is new
+    """
+    highlight = EVENT_CARD_HIGHLIGHT[bool(evt.get('is_new', False))]
+    evt_images = evt.get('images', [])
+
+    # Build image details
+    image_details = [
+        event_image_row(img.get('pos', '?'), img.get('filename', 'unknown'))
+        for img in evt_images[:3]  # Show max 3 images
+    ]
+    if len(evt_images) > 3:
+        image_details.append(
+            dmc.Text(f"... and {len(evt_images) - 3} more", size="xs", c="dimmed", fs="italic")
+        )
+
+    return dmc.Paper(
+        children=dmc.Stack(
+            gap="xs",
+            children=[
+                dmc.Group(
+                    gap="xs",
+                    justify="space-between",
+                    children=[
+                        dmc.Group(
+                            gap="xs",
+                            children=[
+                                dmc.ThemeIcon(
+                                    children="📷",
+                                    size="sm",
+                                    radius="xl",
+                                    **highlight["icon"],
+                                ),
+                                dmc.Text(
+                                    f"+{evt['count']} image{'s' if evt['count'] > 1 else ''}",
+                                    size="sm",
+                                    **highlight["label"],
+                                ),
+                            ]
+                        ),
+                        dmc.Text(
+                            evt['timestamp'],
+                            size="xs",
+                            c="dimmed",
+                        ),
+                    ]
+                ),
+                # Image details
+                dmc.Stack(
+                    gap=2,
+                    children=image_details,
+                ) if image_details else None,
+                dmc.Text(
+                    f"Total: {evt['total']} images",
+                    size="xs",
+                    c="dimmed",
+                ),
+            ]
+        ),
+        p="xs",
+        radius="sm",
+        withBorder=True,
+        **highlight["card"],
+    )
+
+
+def mark_event_card_seen(card):
+    """
+    Drop the highlight from an event card rendered on a previous tick.
+
+    Args:
+        card: Serialized card from create_event_card, or a Patch pointing at
+            one in the browser
+
+    Returns:
+        The same card (or Patch), restyled in place
+    """
+    seen = EVENT_CARD_HIGHLIGHT[False]
+    card["props"].update(seen["card"])
+    # Paper > Stack > header Group > left Group > [ThemeIcon, Text]
+    header = card["props"]["children"]["props"]["children"][0]
+    icon_and_label = header["props"]["children"][0]["props"]["children"]
+    icon_and_label[0]["props"].update(seen["icon"])
+    icon_and_label[1]["props"].update(seen["label"])
+    return card
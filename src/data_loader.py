@@ -1,10 +1,22 @@
 """Data loading and feature generation for the UMAP image explorer."""
 
+import io
+import os
+import threading
+from functools import lru_cache
 from pathlib import Path
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv, feather
+except ImportError:  # optional: multi-threaded CSV parsing and the memory-mapped Feather snapshot
+    pa = None
+    pa_csv = None
+    feather = None
+
 
 def extract_time_info(filename: str) -> dict:
     """
@@ -93,7 +105,8 @@ def generate_time_series_metadata(df: pd.DataFrame, seed: int = 42) -> pd.DataFr
     object_counts = np.random.randint(0, 21, size=len(df_sorted))
     time_bias = np.sin(np.arange(len(df_sorted)) / 10) * 3
     object_counts = np.clip(object_counts + time_bias.astype(int), 0, 20)
-    df_sorted['object_count'] = object_counts
+    # 0-20 fits easily; int32 halves the typed array plotly sends to the browser
+    df_sorted['object_count'] = object_counts.astype(np.int32)
 
     # Calculate minutes elapsed
     df_sorted['time_minutes'] = (df_sorted['timestamp'] - base_time).dt.total_seconds() / 60
@@ -102,29 +115,317 @@ def generate_time_series_metadata(df: pd.DataFrame, seed: int = 42) -> pd.DataFr
     return df_sorted.sort_values('id').reset_index(drop=True)
 
 
+# Columns added by generate_time_series_metadata, recomputed over all rows on every change
+TIME_SERIES_COLUMNS = ['timestamp', 'object_count', 'time_minutes']
+
+# Columns _add_time_info derives from the CZI filename, stored as categoricals
+TIME_INFO_COLUMNS = ['date', 'time_period', 'datetime']
+
+# First underscore-separated 8-digit date in a CZI filename and the AM/PM
+# part right after it, as found by extract_time_info
+CZI_TIME_PATTERN = r'(?:^|_)(?P<date>\d{8})(?:_(?P<time_period>AM|PM))?(?=_|$)'
+
+# Unique per row; kept categorical so new-row lookups compare integer codes
+ROW_KEY_COLUMN = 'patches_2d_ch0_tl_exp_path'
+
+# Per-process parse state for load_phenobase_data, keyed by CSV path
+_csv_state = {}
+_csv_state_lock = threading.Lock()
+
+
+def _csv_signature(stat: os.stat_result, offset: int, last_line: bytes) -> dict:
+    """
+    Identify a CSV revision by its modification time and size, plus the bytes parsed.
+
+    stat must be taken before the parsed bytes were read: the CSV may grow
+    in between, and a later stat would claim rows the snapshot lacks.
+    last_line is the complete line ending at offset, which the next append
+    check starts from.
+    """
+    return {
+        b'source_mtime_ns': str(stat.st_mtime_ns).encode(),
+        b'source_size': str(stat.st_size).encode(),
+        b'source_offset': str(offset).encode(),
+        b'source_last_line': last_line,
+    }
+
+
+def _read_feather_snapshot(csv_path: str, stat: os.stat_result) -> tuple[pd.DataFrame, int, bytes] | None:
+    """
+    Load the processed DataFrame from its Feather snapshot if it matches the CSV.
+
+    The file is memory-mapped, so workers share its pages through the OS cache.
+
+    Returns:
+        Tuple of (DataFrame, CSV bytes it covers, last line of those bytes),
+        or None if there is no usable snapshot
+    """
+    snapshot_path = Path(csv_path).with_suffix('.feather')
+    if feather is None or not snapshot_path.exists():
+        return None
+    try:
+        table = feather.read_table(snapshot_path, memory_map=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
+    metadata = table.schema.metadata or {}
+    if (metadata.get(b'source_mtime_ns') != str(stat.st_mtime_ns).encode()
+            or metadata.get(b'source_size') != str(stat.st_size).encode()
+            or b'source_offset' not in metadata
+            or b'source_last_line' not in metadata):
+        return None
+    return table.to_pandas(), int(metadata[b'source_offset']), metadata[b'source_last_line']
+
+
+def _write_feather_snapshot(df: pd.DataFrame, csv_path: str, stat: os.stat_result, offset: int,
+                            last_line: bytes) -> None:
+    """Save the processed DataFrame as an uncompressed Feather file next to the CSV."""
+    if feather is None:
+        return
+    snapshot_path = Path(csv_path).with_suffix('.feather')
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **_csv_signature(stat, offset, last_line)})
+    tmp_path = snapshot_path.with_suffix(f'.feather.{os.getpid()}.tmp')
+    try:
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, snapshot_path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _add_time_info(df: pd.DataFrame, first_id: int = 0) -> pd.DataFrame:
+    """Number freshly parsed rows, narrow pos and extract date/time from their filenames."""
+    df['id'] = range(first_id, first_id + len(df))
+    # Positions are small grid indices; int16 keeps appended rows the same dtype
+    df['pos'] = df['pos'].astype(np.int16)
+
+    # Extract date/time from filename: the same fields as extract_time_info,
+    # with one regex pass and one date parse over the whole column
+    parts = df['czi_filename'].str.extract(CZI_TIME_PATTERN)
+    dates = pd.to_datetime(parts['date'], format='%Y%m%d', errors='coerce')
+    date = dates.dt.strftime('%Y-%m-%d')
+    time_period = parts['time_period'].where(dates.notna())
+    df['date'] = date.fillna('N/A')
+    df['time_period'] = time_period.fillna('N/A')
+    df['datetime'] = (date + ' ' + time_period).fillna(date).fillna('N/A')
+    # A handful of distinct values each: store them as int8 category codes
+    return df.astype({column: 'category' for column in TIME_INFO_COLUMNS})
+
+
+def _append_rows(base: pd.DataFrame, new_rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Concatenate new rows, extending the categories of categorical columns rather than dropping to object.
+
+    The TIME_INFO_COLUMNS categories are kept sorted, so sorting by their
+    codes stays the same as sorting by value.
+    """
+    dtypes = {}
+    for column in base.columns:
+        if not isinstance(base[column].dtype, pd.CategoricalDtype):
+            continue
+        categories = base[column].cat.categories
+        added = pd.Index(new_rows[column].dropna().unique().tolist()).difference(categories)
+        if len(added):
+            categories = categories.append(added)
+            if column in TIME_INFO_COLUMNS:
+                categories = categories.sort_values()
+        dtypes[column] = pd.CategoricalDtype(categories)
+    return pd.concat([base.astype(dtypes), new_rows.astype(dtypes)], ignore_index=True)
+
+
+def _parse_csv(data: bytes, column_names: list | None = None) -> pd.DataFrame:
+    """
+    Parse phenobase CSV lines, with pyarrow's multi-threaded reader when available.
+
+    Without column_names, data starts at the top of the file: the group header
+    line is skipped and the next line names the columns.
+    """
+    if pa_csv is None:
+        if column_names is None:
+            return pd.read_csv(io.BytesIO(data), skiprows=[0])
+        return pd.read_csv(io.BytesIO(data), header=None, names=column_names)
+    if column_names is None:
+        read_options = pa_csv.ReadOptions(skip_rows=1)
+    else:
+        read_options = pa_csv.ReadOptions(column_names=list(column_names))
+    table = pa_csv.read_csv(
+        io.BytesIO(data),
+        read_options=read_options,
+        convert_options=pa_csv.ConvertOptions(column_types={'pos': pa.int16()}),
+    )
+    # The table is not used afterwards: release each Arrow column as it is
+    # converted, and give every column its own block instead of
+    # consolidating them (another full copy), to keep peak memory down
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def _read_complete_lines(csv_path: str, offset: int, last_line: bytes = b'') -> tuple[bytes, int, bytes] | None:
+    """
+    Read the complete lines from offset on; a partially written last line is left for later.
+
+    last_line is the line expected to end at offset. If the file no longer has
+    it there, the CSV was rewritten rather than appended to and None is returned.
+
+    Returns:
+        Tuple of (bytes read, new offset, last complete line), or None
+    """
+    with open(csv_path, 'rb') as f:
+        f.seek(offset - len(last_line))
+        data = f.read()
+    if not data.startswith(last_line):
+        return None
+    data = data[len(last_line):]
+    end = data.rfind(b'\n') + 1
+    if end == 0:
+        return b'', offset, last_line
+    data = data[:end]
+    return data, offset + end, data[data.rfind(b'\n', 0, end - 1) + 1:]
+
+
+def _refresh_csv_state(csv_path: str) -> dict:
+    """
+    Bring the per-process parse state of csv_path up to date and return it.
+
+    A changed CSV gets a new state dict, so values cached in one (timeline,
+    count_ranges) always belong to its df.
+    """
+    stat = os.stat(csv_path)
+    with _csv_state_lock:
+        state = _csv_state.get(csv_path)
+        if state is not None and (state['mtime_ns'], state['size']) == (stat.st_mtime_ns, stat.st_size):
+            return state
+
+        appended = None
+        if state is not None and stat.st_size >= state['offset']:
+            appended = _read_complete_lines(csv_path, state['offset'], state['last_line'])
+
+        if appended is not None:
+            # Append: parse only the new complete lines
+            data, offset, last_line = appended
+            base = state['base']
+            if data:
+                new_rows = _parse_csv(data, base.columns[:state['n_csv_columns']])
+                new_rows = _add_time_info(new_rows, first_id=len(base))
+                base = _append_rows(base, new_rows)
+                # Generate time series metadata (NEW) - it depends on every row
+                df = generate_time_series_metadata(base)
+            else:
+                df = state['df']
+            n_csv_columns = state['n_csv_columns']
+        else:
+            snapshot = _read_feather_snapshot(csv_path, stat)
+            if snapshot is not None:
+                df, offset, last_line = snapshot
+                base = df.drop(columns=TIME_SERIES_COLUMNS)
+            else:
+                data, offset, last_line = _read_complete_lines(csv_path, 0)
+                base = _add_time_info(_parse_csv(data))
+                if ROW_KEY_COLUMN in base.columns:
+                    base[ROW_KEY_COLUMN] = base[ROW_KEY_COLUMN].astype('category')
+                # Generate time series metadata (NEW)
+                df = generate_time_series_metadata(base)
+                _write_feather_snapshot(df, csv_path, stat, offset, last_line)
+            n_csv_columns = base.columns.get_loc('id')
+
+        _csv_state[csv_path] = {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'offset': offset,
+            'last_line': last_line,
+            'n_csv_columns': n_csv_columns,
+            'base': base,
+            'df': df,
+            'timeline': None,
+            'count_ranges': None,
+        }
+        return _csv_state[csv_path]
+
+
 def load_phenobase_data(csv_path: str = "data/phenobase.csv") -> pd.DataFrame:
     """
     Load phenobase CSV data with time series metadata.
 
+    Results are kept per process: an unchanged CSV returns a shallow copy of
+    the previous DataFrame, and rows appended since the last call are parsed
+    on their own rather than re-reading the whole file. The copy shares the
+    cached column data, so the result must be treated as read-only: adding
+    or replacing whole columns is fine, but writing into existing values
+    (.loc/.iloc) would change the cache when copy-on-write is off. When
+    pyarrow is installed the processed result is also kept as a Feather
+    snapshot beside the CSV and reused until the CSV changes.
+
     Args:
         csv_path: Path to the phenobase CSV file
 
     Returns:
         DataFrame with image metadata and time series columns
     """
-    df = pd.read_csv(csv_path, skiprows=[0])
-    df['id'] = range(len(df))
+    return _refresh_csv_state(csv_path)['df'].copy(deep=False)
+
+
+def load_phenobase_timeline(csv_path: str = "data/phenobase.csv") -> pd.DataFrame:
+    """
+    Load phenobase data sorted by position, then timestamp.
+
+    The sort runs once per change of the CSV and is shared by every caller, so
+    time series views can slice rows without re-sorting them. Like
+    load_phenobase_data, the result must be treated as read-only.
+
+    Args:
+        csv_path: Path to the phenobase CSV file
+
+    Returns:
+        DataFrame ordered by pos and timestamp, keeping the original index
+    """
+    state = _refresh_csv_state(csv_path)
+    with _csv_state_lock:
+        if state['timeline'] is None:
+            state['timeline'] = state['df'].sort_values(['pos', 'timestamp'], kind='stable')
+        return state['timeline']
 
-    # Extract date/time from filename (existing)
-    time_info = df['czi_filename'].apply(extract_time_info)
-    df['date'] = time_info.apply(lambda x: x['date'])
-    df['time_period'] = time_info.apply(lambda x: x['time_period'])
-    df['datetime'] = time_info.apply(lambda x: x['datetime'])
 
-    # Generate time series metadata (NEW)
-    df = generate_time_series_metadata(df)
+def load_position_rows(pos: int, csv_path: str = "data/phenobase.csv") -> pd.DataFrame:
+    """
+    Load the rows recorded at one coordinate position, in timestamp order.
 
-    return df
+    The rows are a contiguous block of load_phenobase_timeline, located by
+    binary search on its sorted pos column instead of a full-column mask.
+
+    Args:
+        pos: Coordinate position
+        csv_path: Path to the phenobase CSV file
+
+    Returns:
+        Read-only slice of the timeline for that position
+    """
+    timeline = load_phenobase_timeline(csv_path)
+    positions = timeline['pos'].to_numpy()
+    start = positions.searchsorted(pos, side='left')
+    stop = positions.searchsorted(pos, side='right')
+    return timeline.iloc[start:stop]
+
+
+def load_position_count_range(pos: int, csv_path: str = "data/phenobase.csv") -> tuple[int, int]:
+    """
+    Get the smallest and largest object_count recorded at one position.
+
+    The ranges of all positions are computed together once per change of the
+    CSV (object counts are regenerated for every row on each change), so
+    callers get them without scanning the rows.
+
+    Args:
+        pos: Coordinate position
+        csv_path: Path to the phenobase CSV file
+
+    Returns:
+        Tuple of (min, max) object count
+    """
+    state = _refresh_csv_state(csv_path)
+    with _csv_state_lock:
+        if state['count_ranges'] is None:
+            state['count_ranges'] = state['df'].groupby('pos')['object_count'].agg(['min', 'max'])
+        ranges = state['count_ranges']
+    count_min, count_max = ranges.loc[pos]
+    return int(count_min), int(count_max)
 
 
 def extract_metadata_columns(df: pd.DataFrame, base_path: str = "data") -> dict:
@@ -161,6 +462,47 @@ def extract_metadata_columns(df: pd.DataFrame, base_path: str = "data") -> dict:
     }
 
 
+def _fill_cluster_features(cluster_assignments: np.ndarray, n_clusters: int, n_features: int, seed: int,
+                           row_shift: np.ndarray, shift_direction: np.ndarray) -> np.ndarray:
+    """
+    Draw one center per cluster and scatter each row around its cluster's center.
+
+    Each row is also moved by row_shift[row] * shift_direction (the position
+    offset) in the same pass, so the feature matrix is written exactly once.
+    """
+    np.random.seed(seed)
+    angle_step = 2 * np.pi / n_clusters
+    centers = np.empty((n_clusters, n_features))
+    for cluster_id in range(n_clusters):
+        angle = cluster_id * angle_step
+        radius = 8.0 + np.random.randn() * 2.0
+        centers[cluster_id, 0] = radius * np.cos(angle)
+        centers[cluster_id, 1] = radius * np.sin(angle)
+        for i in range(2, n_features):
+            centers[cluster_id, i] = np.random.randn() * 3.0
+
+    features = np.empty((len(cluster_assignments), n_features), dtype=np.float32)
+    for row in range(len(cluster_assignments)):
+        center = centers[cluster_assignments[row]]
+        for i in range(n_features):
+            features[row, i] = center[i] + np.random.randn() * 1.2 + row_shift[row] * shift_direction[i]
+    return features
+
+
+@lru_cache(maxsize=None)
+def _feature_kernel():
+    """Compile _fill_cluster_features with Numba on first use; the machine code is cached on disk."""
+    import numba
+    # Serial on purpose: parallel loops would draw from per-thread RNG
+    # streams and break reproducibility for a given seed
+    return numba.njit(cache=True, fastmath=True)(_fill_cluster_features)
+
+
+def prewarm_feature_kernel() -> None:
+    """Compile (or load from cache) the feature kernel ahead of the first UMAP request."""
+    _feature_kernel()(np.zeros(1, dtype=np.int64), 1, 2, 0, np.zeros(1, dtype=np.float32), np.zeros(2, dtype=np.float32))
+
+
 def generate_random_features(df: pd.DataFrame, n_features: int = 50, seed: int = 42) -> tuple[np.ndarray, np.ndarray]:
     """
     Generate random numerical features with distinct clustering patterns for UMAP.
@@ -172,43 +514,47 @@ def generate_random_features(df: pd.DataFrame, n_features: int = 50, seed: int =
         seed: Random seed for reproducibility
 
     Returns:
-        Tuple of (features array of shape (n_samples, n_features), cluster labels)
+        Tuple of (float32 features array of shape (n_samples, n_features), cluster labels)
     """
-    np.random.seed(seed)
+    # A local generator rather than np.random.seed: callbacks running in
+    # parallel threads would otherwise reseed and draw from the same global
+    # state. Numba keeps the kernel's np.random state per thread.
+    rng = np.random.default_rng(seed)
     n_samples = len(df)
 
     n_clusters = max(3, n_samples // 10)
-    cluster_assignments = np.array([i % n_clusters for i in range(n_samples)])
-    np.random.shuffle(cluster_assignments)
-
-    features = np.zeros((n_samples, n_features))
+    cluster_assignments = np.arange(n_samples) % n_clusters
+    rng.shuffle(cluster_assignments)
 
-    angle_step = 2 * np.pi / n_clusters
-    for cluster_id in range(n_clusters):
-        mask = cluster_assignments == cluster_id
-        n_in_cluster = mask.sum()
-
-        if n_in_cluster == 0:
-            continue
+    # Rows at position 0 and the others are pushed apart along one random direction
+    if 'pos' in df.columns:
+        row_shift = np.where(df['pos'].to_numpy() == 0, -2.0, 2.0).astype(np.float32)
+        shift_direction = rng.standard_normal(n_features, dtype=np.float32) * 0.5
+    else:
+        row_shift = np.zeros(n_samples, dtype=np.float32)
+        shift_direction = np.zeros(n_features, dtype=np.float32)
 
-        angle = cluster_id * angle_step
-        radius = 8.0 + np.random.randn() * 2.0
+    # One pass over the rows in compiled code instead of a boolean mask per
+    # cluster, adding the position shift as each value is written
+    features = _feature_kernel()(cluster_assignments, n_clusters, n_features, seed, row_shift, shift_direction)
 
-        cluster_center = np.zeros(n_features)
-        cluster_center[0] = radius * np.cos(angle)
-        cluster_center[1] = radius * np.sin(angle)
+    return features, cluster_assignments
 
-        for i in range(2, n_features):
-            cluster_center[i] = np.random.randn() * 3.0
 
-        features[mask] = cluster_center + np.random.randn(n_in_cluster, n_features) * 1.2
+def _list_image_directory(directory: str) -> frozenset:
+    """Names of the files in an image directory (empty if it does not exist), cached until it changes."""
+    try:
+        mtime_ns = os.stat(directory).st_mtime_ns
+    except OSError:
+        return frozenset()
+    return _scan_directory(directory, mtime_ns)
 
-    if 'pos' in df.columns:
-        pos_values = df['pos'].values
-        pos_shift = np.where(pos_values == 0, -2.0, 2.0).reshape(-1, 1)
-        features += pos_shift * np.random.randn(1, n_features) * 0.5
 
-    return features, cluster_assignments
+@lru_cache(maxsize=64)
+def _scan_directory(directory: str, mtime_ns: int) -> frozenset:
+    """List a directory's files; mtime_ns ties the cached listing to its current contents."""
+    with os.scandir(directory) as entries:
+        return frozenset(entry.name for entry in entries if entry.is_file())
 
 
 def verify_image_paths(df: pd.DataFrame, patch_column: str, base_path: str = "data") -> pd.Series:
@@ -221,17 +567,21 @@ def verify_image_paths(df: pd.DataFrame, patch_column: str, base_path: str = "da
         base_path: Base directory for images
 
     Returns:
-        Series with absolute paths
+        Series with absolute paths (missing for images not on disk)
     """
     base_path = Path(base_path).absolute()
+    rel_paths = df[patch_column]
 
-    def make_absolute(rel_path):
-        if pd.isna(rel_path):
-            return None
-        abs_path = base_path / rel_path
-        return str(abs_path) if abs_path.exists() else None
+    # Check each distinct path against a listing of its directory instead of
+    # stat-ing every row
+    absolute = {}
+    for rel_path in rel_paths.dropna().unique():
+        abs_path = str(base_path / rel_path)
+        directory, name = os.path.split(abs_path)
+        if name in _list_image_directory(directory):
+            absolute[rel_path] = abs_path
 
-    return df[patch_column].apply(make_absolute)
+    return rel_paths.map(absolute)
 
 
 def get_image_dataframe(df: pd.DataFrame, patch_type: str = None, coordinate: int = None) -> pd.DataFrame:
@@ -246,14 +596,18 @@ def get_image_dataframe(df: pd.DataFrame, patch_type: str = None, coordinate: in
     Returns:
         Filtered dataframe with absolute image paths
     """
-    filtered_df = df.copy()
+    filtered_df = df
 
     if coordinate is not None:
         filtered_df = filtered_df[filtered_df['pos'] == coordinate]
 
     if patch_type:
         patch_column = f'patches_2d_{patch_type}_path'
-        filtered_df['image_path'] = verify_image_paths(filtered_df, patch_column)
-        filtered_df = filtered_df[filtered_df['image_path'].notna()]
+        image_paths = verify_image_paths(filtered_df, patch_column)
+        has_image = image_paths.notna()
+        # Boolean indexing already returns new rows; the shallow copy only
+        # detaches them from df so image_path is added to this frame alone
+        filtered_df = filtered_df[has_image].copy(deep=False)
+        filtered_df['image_path'] = image_paths[has_image]
 
     return filtered_df
@@ -92,7 +92,7 @@ def create_layout(patch_types: list, coordinates: list):
                     withBorder=True,
                     shadow="md",
                     radius="lg",
-                    style={"background": "linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%)"},
+                    className="header-gradient",
                 ),
 
                 dmc.Grid(
@@ -122,7 +122,7 @@ def create_layout(patch_types: list, coordinates: list):
                                                     id="coord-dropdown",
                                                     label="Coordinate Position",
                                                     placeholder="Select coordinate",
-                                                    data=[{"label": str(c), "value": str(c)} for c in coordinates],
+                                                    data=[{"label": c, "value": c} for c in map(str, coordinates)],
                                                     value=str(coordinates[0]) if coordinates else None,
                                                 ),
                                             ],
@@ -164,9 +164,11 @@ def create_layout(patch_types: list, coordinates: list):
                                                 ),
                                                 dmc.ScrollArea(
                                                     h=400,
-                                                    children=dmc.Stack(
+                                                    # A plain flex column (see custom.css); the log's
+                                                    # cards are prepended and trimmed on every batch
+                                                    children=html.Div(
                                                         id="event-log-container",
-                                                        gap="xs",
+                                                        className="event-log-stack",
                                                         children=[
                                                             dmc.Text(
                                                                 "Waiting for events...",
@@ -241,14 +243,33 @@ def create_layout(patch_types: list, coordinates: list):
                                                                         ),
                                                                     ]
                                                                 ),
-                                                                dcc.Loading(
-                                                                    id="loading-umap",
-                                                                    type="default",
-                                                                    children=dcc.Graph(
-                                                                        id="umap-plot",
-                                                                        style={"height": "500px"},
-                                                                        config={"displayModeBar": True}
-                                                                    ),
+                                                                # An overlay rather than dcc.Loading, which
+                                                                # remounts the graph (and its WebGL context)
+                                                                # on every update; the UMAP callbacks toggle it
+                                                                dmc.Box(
+                                                                    pos="relative",
+                                                                    children=[
+                                                                        dmc.LoadingOverlay(id="loading-umap", visible=False),
+                                                                        # Figures for this graph must use scattergl
+                                                                        # traces (see build_umap_figure)
+                                                                        dcc.Graph(
+                                                                            id="umap-plot",
+                                                                            style={"height": "500px", "willChange": "transform"},
+                                                                            config={
+                                                                                "displayModeBar": True,
+                                                                                "modeBarButtonsToRemove": [
+                                                                                    "autoScale2d",
+                                                                                    "toggleSpikelines",
+                                                                                    "hoverClosestCartesian",
+                                                                                    "hoverCompareCartesian",
+                                                                                ],
+                                                                                "scrollZoom": True,
+                                                                                "doubleClick": "reset",
+                                                                                # Draw WebGL markers at 1x on HiDPI screens
+                                                                                "plotGlPixelRatio": 1,
+                                                                            },
+                                                                        ),
+                                                                    ]
                                                                 ),
                                                             ],
                                                             withBorder=True,
@@ -265,19 +286,14 @@ def create_layout(patch_types: list, coordinates: list):
                                                         dmc.Card(
                                                             children=[
                                                                 dmc.Title("Selected Images", order=4, mb="sm"),
-                                                                dcc.Loading(
-                                                                    id="loading-images",
-                                                                    type="default",
-                                                                    children=html.Div(
-                                                                        id="image-grid-container",
-                                                                        children=html.Div(
-                                                                            id="image-grid",
-                                                                            style={
-                                                                                "height": "500px",
-                                                                                "overflowY": "auto",
-                                                                            }
-                                                                        )
-                                                                    ),
+                                                                # Built by a clientside callback, so there is
+                                                                # no server wait to show a loader for
+                                                                html.Div(
+                                                                    id="image-grid",
+                                                                    style={
+                                                                        "height": "500px",
+                                                                        "overflowY": "auto",
+                                                                    }
                                                                 ),
                                                             ],
                                                             withBorder=True,
@@ -324,8 +340,6 @@ def create_layout(patch_types: list, coordinates: list):
                                                         "displayModeBar": True,
                                                         "modeBarButtonsToRemove": ["lasso2d", "select2d"],
                                                     },
-                                                    # Enable smooth transitions
-                                                    animate=True,
                                                 ),
                                             ],
                                             withBorder=True,
@@ -362,18 +376,29 @@ def create_layout(patch_types: list, coordinates: list):
                                                 ),
                                                 dag.AgGrid(
                                                     id="data-table",
-                                                    columnSize="sizeToFit",
+                                                    # Sized once, when the first block of rows is
+                                                    # shown; columnSize would run before rows load
+                                                    eventListeners={
+                                                        "firstDataRendered": ["params.api.autoSizeAllColumns()"],
+                                                    },
                                                     defaultColDef={
                                                         "resizable": True,
                                                         "sortable": True,
                                                         "filter": True,
                                                     },
+                                                    # Rows are fetched in blocks from the server as
+                                                    # the grid scrolls (see get_table_rows)
+                                                    rowModelType="infinite",
                                                     dashGridOptions={
-                                                        "pagination": True,
-                                                        "paginationPageSize": 10,
-                                                        "animateRows": True,
+                                                        "cacheBlockSize": 100,
+                                                        "maxBlocksInCache": 10,
+                                                        # dash-ag-grid keeps one pending request;
+                                                        # a second concurrent block would replace it
+                                                        "maxConcurrentDatasourceRequests": 1,
+                                                        "animateRows": False,
+                                                        "rowBuffer": 5,
                                                         "rowClassRules": {
-                                                            "new-row-highlight": "params.data._is_new",
+                                                            "new-row-highlight": "params.data && params.data._is_new",
                                                         },
                                                     },
                                                     getRowId="params.data._row_id",
@@ -394,13 +419,12 @@ def create_layout(patch_types: list, coordinates: list):
 
                 # Stores
                 dcc.Store(id="data-store"),
-                dcc.Store(id="features-store"),
                 dcc.Store(id="timeseries-store"),
                 dcc.Store(id="ws-message-store"),
+                dcc.Store(id="ws-active-store"),  # ws-message-store, held back while paused
+                dcc.Store(id="table-view-store"),  # Which rows the data table shows
                 dcc.Store(id="event-log-store", data=[]),
                 dcc.Store(id="pending-update-store", data=False),
-                dcc.Store(id="new-rows-store", data=[]),  # Track newly added row IDs
-                dcc.Store(id="known-rows-store", data=[]),  # Track all known row IDs
 
                 # Location for WebSocket URL
                 dcc.Location(id="url-location", refresh=False),
@@ -413,9 +437,11 @@ def create_layout(patch_types: list, coordinates: list):
                     id="image-modal",
                     size="xl",
                     children=[
-                        html.Img(
+                        dmc.Image(
                             id="modal-image",
-                            style={"width": "100%", "height": "auto"}
+                            style={"width": "100%", "height": "auto"},
+                            # Decode the full-size image off the main thread
+                            attributes={"root": {"decoding": "async"}},
                         )
                     ],
                 ),
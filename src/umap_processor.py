@@ -1,31 +1,110 @@
 """UMAP embedding computation with caching."""
 
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
-from umap import UMAP
-from sklearn.preprocessing import StandardScaler
+
+# "auto" uses cuML when installed, "cpu" forces umap-learn
+UMAP_BACKEND = os.environ.get("DEPICTIO_UMAP_BACKEND", "auto").lower()
+
+# Recent embeddings keyed by feature content and parameters (see
+# compute_umap_embedding); each is only n_samples x 2 floats
+EMBEDDING_CACHE_SIZE = 32
+_embedding_cache = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _umap_class():
+    """
+    Import the UMAP implementation on first use.
+
+    umap-learn (numba) and cuML take seconds and a lot of memory to import,
+    so the server doesn't load them until an embedding is actually computed.
+    """
+    if UMAP_BACKEND != "cpu":
+        try:
+            from cuml.manifold import UMAP as cuUMAP  # optional: GPU UMAP
+            return cuUMAP, True
+        except ImportError:
+            pass
+    from umap import UMAP
+    return UMAP, False
 
 
 def compute_umap_embedding(features: np.ndarray, n_neighbors: int = 10, min_dist: float = 0.3) -> np.ndarray:
     """
     Compute UMAP embedding from features optimized for speed.
 
+    Runs on the GPU through cuML when it is installed, unless
+    DEPICTIO_UMAP_BACKEND=cpu.
+
     Args:
         features: Feature matrix of shape (n_samples, n_features)
         n_neighbors: Number of neighbors for UMAP (lower = more local structure)
         min_dist: Minimum distance for UMAP (higher = more spread out)
 
     Returns:
-        UMAP embedding of shape (n_samples, 2)
+        UMAP embedding of shape (n_samples, 2), read-only
     """
-    scaler = StandardScaler()
-    features_scaled = scaler.fit_transform(features)
+    # The same features come back under different result keys (e.g. a time
+    # filter reset to the full range), so repeats are found by content.
+    # Hashing the buffer is negligible next to a UMAP fit.
+    features = np.ascontiguousarray(features)
+    key = (
+        hashlib.blake2b(features.view(np.uint8), digest_size=16).digest(),
+        features.shape, features.dtype.str, n_neighbors, min_dist, UMAP_BACKEND,
+    )
+    with _embedding_cache_lock:
+        embedding = _embedding_cache.get(key)
+        if embedding is not None:
+            _embedding_cache.move_to_end(key)
+            return embedding
+
+    embedding = _fit_umap(features, n_neighbors, min_dist)
+    embedding.flags.writeable = False
+    with _embedding_cache_lock:
+        _embedding_cache[key] = embedding
+        if len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+            _embedding_cache.popitem(last=False)
+    return embedding
+
+
+def _fit_umap(features: np.ndarray, n_neighbors: int, min_dist: float) -> np.ndarray:
+    """Standardize features and fit a 2-D UMAP to them."""
+    # Standardized in place on a float32 copy, as StandardScaler would
+    # (population std, constant columns left unscaled), without its float64
+    # copy; the neighbor search then moves half the bytes
+    features_scaled = np.array(features, dtype=np.float32)
+    features_scaled -= features_scaled.mean(axis=0)
+    std = features_scaled.std(axis=0)
+    std[std == 0] = 1
+    features_scaled /= std
 
     n_samples = features.shape[0]
     n_neighbors_adj = min(n_neighbors, n_samples - 1)
 
     n_epochs = 100 if n_samples < 100 else 200
 
+    UMAP, on_gpu = _umap_class()
+    if on_gpu:
+        gpu_model = UMAP(
+            n_neighbors=n_neighbors_adj,
+            min_dist=min_dist,
+            n_components=2,
+            metric='euclidean',
+            spread=1.0,
+            n_epochs=n_epochs,
+            init='spectral',
+            output_type='numpy',
+        )
+        return gpu_model.fit_transform(features_scaled)
+
     umap_model = UMAP(
         n_neighbors=n_neighbors_adj,
         min_dist=min_dist,
@@ -57,7 +136,8 @@ def create_umap_dataframe(df: pd.DataFrame, embedding: np.ndarray, clusters: np.
     Returns:
         DataFrame with UMAP coordinates and metadata
     """
-    umap_df = df.copy()
+    # Shallow: the columns set below replace whole columns, never write into df's
+    umap_df = df.copy(deep=False)
     umap_df['umap_x'] = embedding[:, 0]
     umap_df['umap_y'] = embedding[:, 1]
 